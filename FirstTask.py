@@ -1,42 +1,422 @@
+import csv
+import heapq
 import json
 import os
+import signal
+import sys
+import time
+from array import array
+from operator import add
 
-FILE = "attendance.json"
+from storage import append_durable, atomic_open, file_lock, file_version, quarantine, write_atomic
+
+FILE = "attendance.snap"
+LEGACY_FILE = "attendance.json"
+JOURNAL_FILE = "attendance.journal"
+COMPACT_EVERY = 200
+FLUSH_INTERVAL = 30  # секунд між автоматичними збереженнями
+IMPORT_CHUNK = 100_000  # рядків файлу пропусків на один запис у журнал
+PAGE_SIZE = 30  # рядків таблиці на одну сторінку
+
+# Кількість записів у журналі після останнього знімка
+journal_ops = 0
+# Чи закінчувався журнал при останньому читанні недописаним рядком
+journal_torn = False
 
 
 def full_name(s):
     return f"{s['surname']} {s['name']}".strip()
 
 
-def load_data():
-    if not os.path.exists(FILE):
-        empty = {"students": [], "disciplines": [], "attendance": {}}
-        save_data(empty)
-        return empty
+# ------------------ Матриця пропусків ------------------
+
+class AttendanceMatrix:
+    """Пропуски в стовпцевому вигляді.
+
+    Кожен студент має цілий номер рядка, кожна дисципліна — власний стовпець
+    array("I") (4 байти на клітинку), тож 100k студентів × 200 дисциплін
+    займають близько 80 МБ. Підсумки рахуються згортками цілих стовпців.
+    Кількість у клітинці обмежена 0..MAX_COUNT: значення поза межами
+    обрізаються ще до запису, тож пакетна операція не обривається посередині.
+    """
+
+    MAX_COUNT = 2 ** 32 - 1
+
+    def __init__(self):
+        self.rows = {}      # повне імʼя -> номер рядка
+        self.names = []     # номер рядка -> повне імʼя (None, якщо звільнений)
+        self.free = []      # звільнені номери рядків для повторного використання
+        self.columns = {}   # дисципліна -> array("I"), впорядковано як у файлі
+
+    def __contains__(self, full):
+        return full in self.rows
+
+    def add_row(self, full):
+        if self.free:
+            row = self.free.pop()
+            self.names[row] = full
+        else:
+            row = len(self.names)
+            self.names.append(full)
+            for col in self.columns.values():
+                col.append(0)
+        self.rows[full] = row
+        return row
+
+    def remove_row(self, full):
+        row = self.rows.pop(full)
+        self.names[row] = None
+        self.free.append(row)
+        # Обнулюємо, щоб звільнений рядок не впливав на підсумки
+        for col in self.columns.values():
+            col[row] = 0
+
+    def rename_row(self, full, new_full):
+        row = self.rows.pop(full)
+        self.rows[new_full] = row
+        self.names[row] = new_full
+
+    def add_column(self, disc):
+        self.columns[disc] = array("I", [0]) * len(self.names)
+
+    def remove_column(self, disc):
+        del self.columns[disc]
+
+    def add(self, full, disc, count=1):
+        col = self.columns[disc]
+        r = self.rows[full]
+        col[r] = min(max(col[r] + count, 0), self.MAX_COUNT)
+
+    def row(self, full):
+        r = self.rows[full]
+        return {d: col[r] for d, col in self.columns.items()}
+
+    def column_totals(self):
+        return {d: sum(col) for d, col in self.columns.items()}
+
+    def row_totals(self, disciplines=None):
+        if disciplines is None:
+            disciplines = self.columns
+        totals = array("Q", [0]) * len(self.names)
+        for d in disciplines:
+            totals = array("Q", map(add, totals, self.columns[d]))
+        return totals
+
+    def top_absentees(self, n):
+        totals = self.row_totals()
+        best = heapq.nlargest(n, self.rows.values(), key=totals.__getitem__)
+        return [(self.names[r], totals[r]) for r in best]
+
+
+# У памʼяті студенти зберігаються як {повне імʼя: запис}, а дисципліни є
+# стовпцями матриці, тож пошук і видалення — O(1).
+#
+# Знімок FILE стовпцевий: перший рядок — JSON-заголовок зі списками студентів,
+# їхніх номерів рядків і дисциплін, далі по черзі сирі байти кожного стовпця.
+# Запис і читання йдуть цілими стовпцями, без словника на кожну клітинку.
+# LEGACY_FILE з попереднім форматом (словник attendance) читається лише як
+# перший знімок, доки компакція не запише FILE.
+
+def from_json(raw):
+    students = {full_name(s): s for s in raw["students"]}
+    matrix = AttendanceMatrix()
+    for disc in raw["disciplines"]:
+        matrix.add_column(disc)
+    for full in students:
+        matrix.add_row(full)
+        for disc, count in raw["attendance"].get(full, {}).items():
+            if disc in matrix.columns:
+                matrix.add(full, disc, count)
+
+    return {"students": students, "matrix": matrix, "seq": raw.get("seq", 0)}
+
+
+def read_snapshot(f):
+    header = json.loads(f.readline())
+    size = header["size"]
+    matrix = AttendanceMatrix()
+    matrix.names = [None] * size
+    students = {}
+    for s, row in zip(header["students"], header["rows"]):
+        full = full_name(s)
+        students[full] = s
+        matrix.rows[full] = row
+        matrix.names[row] = full
+    matrix.free = [row for row, full in enumerate(matrix.names) if full is None]
+
+    for disc in header["disciplines"]:
+        col = array("I")
+        col.fromfile(f, size)
+        if header["byteorder"] != sys.byteorder:
+            col.byteswap()
+        matrix.columns[disc] = col
+    if f.read(1):
+        raise ValueError("зайві байти після стовпців")
+
+    return {"students": students, "matrix": matrix, "seq": header["seq"]}
+
+
+def empty_data():
+    # Викликається лише під file_lock(FILE).
+    # Новий знімок робить старий журнал недійсним
+    if os.path.exists(JOURNAL_FILE):
+        os.remove(JOURNAL_FILE)
+    data = {"students": {}, "matrix": AttendanceMatrix(), "seq": 0}
+    save_data(data)
+    return data
+
 
+def load_legacy(locked):
     try:
-        with open(FILE, "r", encoding="utf-8") as f:
+        with open(LEGACY_FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
     except (json.JSONDecodeError, StopIteration):
-
-        data = {"students": [], "disciplines": [], "attendance": {}}
-        save_data(data)
-        return data
+        if locked:
+            print(f"⚠ {LEGACY_FILE} пошкоджено, збережено копію як {quarantine(LEGACY_FILE)}")
+        return None
 
     if "students" not in data or "disciplines" not in data or "attendance" not in data:
-        data = {"students": [], "disciplines": [], "attendance": {}}
-        save_data(data)
-        return data
-
+        if locked:
+            print(f"⚠ {LEGACY_FILE} має невідомий формат, збережено копію як {quarantine(LEGACY_FILE)}")
+        return None
+    return from_json(data)
+
+
+def read_data(locked):
+    """Знімок разом із журналом або None, якщо знімка немає чи він пошкоджений.
+    Пошкоджений файл відкладається лише під блокуванням."""
+    if os.path.exists(FILE):
+        try:
+            with open(FILE, "rb") as f:
+                data = read_snapshot(f)
+        except (ValueError, KeyError, TypeError, IndexError, EOFError):
+            if locked:
+                print(f"⚠ {FILE} пошкоджено, збережено копію як {quarantine(FILE)}")
+            return None
+    elif os.path.exists(LEGACY_FILE):
+        data = load_legacy(locked)
+        if data is None:
+            return None
+    else:
+        return None
+
+    replay_journal(data)
     return data
 
 
-def save_data(data):
-    with open(FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+def load_data(locked=False):
+    """locked=True означає, що виклик уже тримає file_lock(FILE)."""
+    data = read_data(locked)
+    if data is not None:
+        return data
+    if not locked:
+        # Скидаємо сховище лише під блокуванням і після повторного читання:
+        # інший процес міг саме записати знімок.
+        with file_lock(FILE):
+            return load_data(locked=True)
+    return empty_data()
 
 
-def add_student():
+def save_data(data):
+    matrix = data["matrix"]
+    students = data["students"]
+    header = {
+        "seq": data.get("seq", 0),
+        "size": len(matrix.names),
+        "byteorder": sys.byteorder,
+        "disciplines": list(matrix.columns),
+        "students": list(students.values()),
+        "rows": [matrix.rows[full] for full in students],
+    }
+    with atomic_open(FILE, binary=True) as f:
+        f.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+        for col in matrix.columns.values():
+            col.tofile(f)
+
+
+# ------------------ Журнал змін ------------------
+#
+# Кожна зміна дописується в JOURNAL_FILE одним рядком JSON з номером "seq".
+# Стан = знімок FILE + записи журналу з seq більшим, ніж у знімку.
+# Раз на COMPACT_EVERY операцій знімок перезаписується, а журнал очищується.
+
+def apply_op(data, op):
+    kind = op["op"]
+    students = data["students"]
+    matrix = data["matrix"]
+
+    if kind == "add_student":
+        full = f"{op['surname']} {op['name']}"
+        if full in students:
+            return
+        students[full] = {"surname": op["surname"], "name": op["name"]}
+        matrix.add_row(full)
+    elif kind == "remove_student":
+        if op["full"] not in students:
+            return
+        del students[op["full"]]
+        matrix.remove_row(op["full"])
+    elif kind == "rename_student":
+        new_full = f"{op['surname']} {op['name']}"
+        if op["full"] not in students or new_full in students:
+            return
+        del students[op["full"]]
+        students[new_full] = {"surname": op["surname"], "name": op["name"]}
+        matrix.rename_row(op["full"], new_full)
+    elif kind == "add_discipline":
+        if op["discipline"] in matrix.columns:
+            return
+        matrix.add_column(op["discipline"])
+    elif kind == "remove_discipline":
+        if op["discipline"] not in matrix.columns:
+            return
+        matrix.remove_column(op["discipline"])
+    elif kind == "add_absence":
+        if op["discipline"] not in matrix.columns:
+            return
+        for full in op["students"]:
+            if full in students:
+                matrix.add(full, op["discipline"])
+    elif kind == "bulk_absence":
+        for full, disc, count in op["counts"]:
+            if full in students and disc in matrix.columns:
+                matrix.add(full, disc, count)
+
+
+def replay_journal(data):
+    global journal_ops, journal_torn
+    journal_ops = 0
+    journal_torn = False
+
+    if not os.path.exists(JOURNAL_FILE):
+        return
+
+    snapshot_seq = data.get("seq", 0)
+    with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                # Недописаний останній рядок: або аварійне завершення, або інший
+                # процес саме дописує. Розрізнити можна лише під блокуванням,
+                # тож тут лише зупиняємось, а знімок робить commit().
+                journal_torn = True
+                break
+            if op["seq"] <= snapshot_seq:
+                continue
+            apply_op(data, op)
+            data["seq"] = op["seq"]
+            journal_ops += 1
+
+
+def append_journal(data, ops):
+    """Дописує вже застосовані до data операції в журнал одним записом."""
+    global journal_ops
+
+    seq = data.get("seq", 0)
+    lines = []
+    for op in ops:
+        seq += 1
+        op["seq"] = seq
+        lines.append(json.dumps(op, ensure_ascii=False) + "\n")
+
+    append_durable(JOURNAL_FILE, "".join(lines))
+    data["seq"] = seq
+    journal_ops += len(ops)
+
+
+def compact(data):
+    global journal_ops, journal_torn
+
+    # Спершу знімок, потім очищення журналу: якщо впаде між ними,
+    # записи з seq <= data["seq"] просто пропустяться при наступному завантаженні.
+    save_data(data)
+    write_atomic(JOURNAL_FILE, "")
+    journal_ops = 0
+    journal_torn = False
+
+
+# ------------------ Сховище в памʼяті ------------------
+
+def files_version():
+    return file_version(FILE), file_version(JOURNAL_FILE)
+
+
+class AttendanceStore:
+    """Дані відвідування, завантажені один раз на сесію.
+
+    Зміни застосовуються в памʼяті й потрапляють у журнал лише під час
+    commit(): явно, при виході або не частіше ніж раз на flush_interval секунд.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.pending = []   # операції, ще не записані в журнал
+        self.dirty = set()  # студенти, чиї рядки змінились після commit()
+        self.load()
+
+    def load(self, locked=False):
+        self.data = load_data(locked)
+        self.seen = files_version()
+        self.last_flush = time.monotonic()
+
+    def refresh(self, locked=False):
+        """Перечитує файли, якщо їх змінив інший процес, і повторно застосовує
+        незбережені операції поверх нового стану."""
+        if files_version() == self.seen:
+            return False
+
+        self.load(locked)
+        for op in self.pending:
+            apply_op(self.data, op)
+        return True
+
+    def apply(self, op):
+        apply_op(self.data, op)
+        self.pending.append(op)
+
+        if op["op"] == "add_absence":
+            self.dirty.update(op["students"])
+        elif op["op"] == "bulk_absence":
+            self.dirty.update(full for full, _, _ in op["counts"])
+        elif op["op"] == "remove_student":
+            self.dirty.add(op["full"])
+        elif op["op"] in ("add_student", "rename_student"):
+            self.dirty.add(f"{op['surname']} {op['name']}")
+        else:
+            # Зміна дисципліни зачіпає всі рядки
+            self.dirty.update(self.data["students"])
+
+    def commit(self):
+        if not self.pending:
+            return
+
+        # Під блокуванням: якщо інший процес встиг щось записати, спершу
+        # підтягуємо його зміни, а вже потім дописуємо свої операції.
+        with file_lock(FILE):
+            self.refresh(locked=True)
+            if journal_torn:
+                # Під блокуванням ніхто не дописує, тож обірваний рядок лишився
+                # після аварії. Дописувати після нього не можна: операції,
+                # уже застосовані до data, одразу йдуть у новий знімок.
+                self.data["seq"] = self.data.get("seq", 0) + len(self.pending)
+                compact(self.data)
+            else:
+                append_journal(self.data, self.pending)
+                if journal_ops >= COMPACT_EVERY:
+                    compact(self.data)
+            self.seen = files_version()
+
+        self.pending = []
+        self.dirty = set()
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.commit()
+
+
+def add_student(store):
     surname = input("Прізвище: ").strip()
     name = input("Імʼя: ").strip()
 
@@ -46,99 +426,90 @@ def add_student():
 
     full = f"{surname} {name}"
 
-    data = load_data()
+    data = store.data
 
-    if full in data["attendance"]:
+    if full in data["students"]:
         print("Студент вже існує.")
         return
 
-    data["students"].append({"surname": surname, "name": name})
-    data["attendance"][full] = {d: 0 for d in data["disciplines"]}
-
-    save_data(data)
+    store.apply({"op": "add_student", "surname": surname, "name": name})
     print("Студента додано.")
 
 
-def remove_student():
+def remove_student(store):
     surname = input("Прізвище: ").strip()
     name = input("Імʼя: ").strip()
     full = f"{surname} {name}"
 
-    data = load_data()
+    data = store.data
 
-    found = False
+    if full not in data["students"]:
+        print("Студент не знайдений.")
+        return
 
-    new_list = []
-    for s in data["students"]:
-        if full_name(s) == full:
-            found = True
-        else:
-            new_list.append(s)
+    store.apply({"op": "remove_student", "full": full})
+    print("Студента видалено.")
 
-    if not found:
+
+def rename_student(store):
+    full = input("Поточні прізвище та імʼя: ").strip()
+    data = store.data
+
+    if full not in data["students"]:
         print("Студент не знайдений.")
         return
 
-    data["students"] = new_list
+    surname = input("Нове прізвище: ").strip()
+    name = input("Нове імʼя: ").strip()
 
-    if full in data["attendance"]:
-        del data["attendance"][full]
+    if not surname or not name:
+        print("Прізвище та імʼя не можуть бути порожніми.")
+        return
 
-    save_data(data)
-    print("Студента видалено.")
+    if f"{surname} {name}" in data["students"]:
+        print("Студент вже існує.")
+        return
 
+    store.apply({"op": "rename_student", "full": full, "surname": surname, "name": name})
+    print("Студента перейменовано.")
 
-def add_discipline():
+
+def add_discipline(store):
     disc = input("Назва дисципліни: ").strip()
 
     if not disc:
         print("Назва дисципліни не може бути порожня.")
         return
 
-    data = load_data()
+    data = store.data
 
-    if disc in data["disciplines"]:
+    if disc in data["matrix"].columns:
         print("Дисципліна вже існує.")
         return
 
-    data["disciplines"].append(disc)
-
-    for s in data["students"]:
-        full = full_name(s)
-        if full not in data["attendance"]:
-            data["attendance"][full] = {}
-        data["attendance"][full][disc] = 0
-
-    save_data(data)
+    store.apply({"op": "add_discipline", "discipline": disc})
     print("Дисципліну додано.")
 
 
-def remove_discipline():
+def remove_discipline(store):
     disc = input("Назва дисципліни: ").strip()
-    data = load_data()
+    data = store.data
 
-    if disc not in data["disciplines"]:
+    if disc not in data["matrix"].columns:
         print("Немає такої дисципліни.")
         return
 
-    data["disciplines"].remove(disc)
-
-    for s in data["students"]:
-        full = full_name(s)
-        if disc in data["attendance"][full]:
-            del data["attendance"][full][disc]
-
-    save_data(data)
+    store.apply({"op": "remove_discipline", "discipline": disc})
     print("Дисципліну видалено.")
 
 
-def add_absence():
-    data = load_data()
+def add_absence(store):
+    data = store.data
 
     if not data["students"]:
         print("Немає жодного студента.")
         return
-    if not data["disciplines"]:
+    if not data["matrix"].columns:
         print("Немає жодної дисципліни.")
         return
 
@@ -147,61 +518,272 @@ def add_absence():
 
     discipline = input("Дисципліна: ").strip()
 
-    if discipline not in data["disciplines"]:
+    if discipline not in data["matrix"].columns:
         print("Такої дисципліни немає.")
         return
 
+    found = []
     missing = []
 
     for full in names:
-        if full in data["attendance"]:
-            data["attendance"][full][discipline] += 1
+        if full in data["students"]:
+            found.append(full)
         else:
             missing.append(full)
 
-    save_data(data)
+    if found:
+        store.apply({"op": "add_absence", "discipline": discipline, "students": found})
 
     print("Пропуски додано.")
     if missing:
         print("⚠ Наступних студентів не знайдено:", ", ".join(missing))
 
 
-def show_table():
-    data = load_data()
+def import_absence_file(store, path, chunk_size=IMPORT_CHUNK):
+    """Потоково застосовує файл відмітки з рядками "Прізвище Імʼя;Дисципліна;Дата".
+
+    Рядки агрегуються в лічильники по (студент, дисципліна) і зберігаються
+    одним записом журналу на кожні chunk_size рядків, тож памʼять на вході
+    не залежить від розміру файлу. Дата зчитується, але не зберігається:
+    таблиця відвідування містить лише кількість пропусків.
+    Повертає (кількість рядків, невідомі студенти, невідомі дисципліни).
+    """
+    students = store.data["students"]
+    columns = store.data["matrix"].columns
+
+    rows = 0
+    missing = {}
+    missing_disc = {}
+    counts = {}
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        first = f.readline()
+        delimiter = ";" if ";" in first else ","
+        f.seek(0)
+
+        for r in csv.reader(f, delimiter=delimiter):
+            if len(r) < 2:
+                continue
+            full = r[0].strip()
+            disc = r[1].strip()
+
+            if full not in students:
+                # Заголовок файлу теж потрапить сюди й буде відкинутий
+                if rows or full.lower() not in ("студент", "student"):
+                    missing[full] = None
+                continue
+            if disc not in columns:
+                missing_disc[disc] = None
+                continue
+
+            key = (full, disc)
+            counts[key] = counts.get(key, 0) + 1
+            rows += 1
+
+            if rows % chunk_size == 0:
+                flush_counts(store, counts)
+                counts = {}
+
+    flush_counts(store, counts)
+    return rows, list(missing), list(missing_disc)
+
+
+def flush_counts(store, counts):
+    if not counts:
+        return
+    store.apply({
+        "op": "bulk_absence",
+        "counts": [[full, disc, n] for (full, disc), n in counts.items()],
+    })
+    store.commit()
+
+
+def import_absences(store):
+    path = input("Файл з пропусками (CSV): ").strip()
+
+    if not os.path.exists(path):
+        print("Файл не знайдено.")
+        return
+
+    rows, missing, missing_disc = import_absence_file(store, path)
+
+    print(f"Пропуски додано: {rows}.")
+    if missing:
+        print("⚠ Наступних студентів не знайдено:", ", ".join(missing))
+    if missing_disc:
+        print("⚠ Наступних дисциплін не знайдено:", ", ".join(missing_disc))
+
+
+def iter_table_rows(store, disciplines=None, prefix="", sort_by_total=False):
+    """Генерує рядки таблиці як (повне імʼя, [пропуски по disciplines]).
+
+    Рядки не збираються в памʼяті, крім випадку sort_by_total, коли
+    потрібен порядок за сумою пропусків по вибраних дисциплінах.
+    """
+    matrix = store.data["matrix"]
+    if disciplines is None:
+        disciplines = list(matrix.columns)
+    cols = [matrix.columns[d] for d in disciplines]
+
+    names = (full for full in store.data["students"] if full.startswith(prefix))
+    if sort_by_total:
+        totals = matrix.row_totals(disciplines)
+        names = sorted(names, key=lambda full: totals[matrix.rows[full]], reverse=True)
+
+    for full in names:
+        r = matrix.rows[full]
+        yield full, [col[r] for col in cols]
+
+
+def format_table_row(full, counts):
+    return full.ljust(25) + "".join(str(m).ljust(20) for m in counts)
+
+
+def ask_table_filter(store):
+    """Питає фільтри таблиці; повертає None, якщо введено невідому дисципліну."""
+    columns = store.data["matrix"].columns
+
+    chosen = input("Дисципліни через кому (порожньо — всі): ").strip()
+    if chosen:
+        disciplines = [d.strip() for d in chosen.split(",") if d.strip()]
+        unknown = [d for d in disciplines if d not in columns]
+        if unknown:
+            print("Немає таких дисциплін:", ", ".join(unknown))
+            return None
+    else:
+        disciplines = list(columns)
+
+    prefix = input("Початок прізвища (порожньо — всі): ").strip()
+    sort_by_total = input("Сортувати за кількістю пропусків? (т/н): ").strip().lower() in ("т", "y")
+    return disciplines, prefix, sort_by_total
+
+
+def show_table(store, page_size=PAGE_SIZE):
+    data = store.data
 
     if not data["students"]:
         print("Таблиця порожня.")
         return
 
+    table_filter = ask_table_filter(store)
+    if table_filter is None:
+        return
+    disciplines, prefix, sort_by_total = table_filter
+
     print("\n=== Таблиця відвідування ===")
+    print(format_table_row("Студент", disciplines))
 
-    header = "Студент".ljust(25)
-    for d in data["disciplines"]:
-        header += d.ljust(20)
-    print(header)
+    shown = 0
+    for full, counts in iter_table_rows(store, disciplines, prefix, sort_by_total):
+        if shown and shown % page_size == 0:
+            if input("-- Enter — далі, q — досить --").strip().lower() == "q":
+                return
+        print(format_table_row(full, counts))
+        shown += 1
+
+    if not shown:
+        print("Немає студентів за цим фільтром.")
 
-    for s in data["students"]:
-        full = full_name(s)
-        row = full.ljust(25)
-        for d in data["disciplines"]:
-            row += str(data["attendance"][full].get(d, 0)).ljust(20)
-        print(row)
 
+def export_table(store):
+    path = input("Файл для експорту (.csv або .tsv): ").strip()
+    if not path:
+        print("Назва файлу не може бути порожня.")
+        return
 
-def show_student():
+    table_filter = ask_table_filter(store)
+    if table_filter is None:
+        return
+    disciplines, prefix, sort_by_total = table_filter
+
+    delimiter = "\t" if path.lower().endswith(".tsv") else ";"
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(["Студент"] + disciplines)
+        for full, counts in iter_table_rows(store, disciplines, prefix, sort_by_total):
+            writer.writerow([full] + counts)
+            rows += 1
+
+    print(f"Експортовано рядків: {rows}.")
+
+
+def show_student(store):
     full = input("Прізвище та імʼя студента: ").strip()
-    data = load_data()
+    data = store.data
 
-    if full not in data["attendance"]:
+    if full not in data["students"]:
         print("Немає такого студента.")
         return
 
     print(f"\n=== Відвідування: {full} ===")
-    for d, m in data["attendance"][full].items():
+    for d, m in data["matrix"].row(full).items():
         print(f"{d}: {m}")
 
 
+def show_summary(store, top=10):
+    matrix = store.data["matrix"]
+
+    if not matrix.rows or not matrix.columns:
+        print("Таблиця порожня.")
+        return
+
+    print("\n=== Пропуски по дисциплінах ===")
+    for d, total in matrix.column_totals().items():
+        print(f"{d}: {total}")
+
+    print(f"\n=== Найбільше пропусків (топ {top}) ===")
+    for full, total in matrix.top_absentees(top):
+        print(f"{full}: {total}")
+
+
+def commit(store):
+    changed = len(store.dirty)
+    store.commit()
+    print(f"Збережено (змінених рядків: {changed}).")
+
+
+def exit_on_signal(signum, frame):
+    # Закритий термінал (SIGHUP) чи kill (SIGTERM) завершують програму
+    # через SystemExit, тож finally у main() встигає записати зміни
+    raise SystemExit(128 + signum)
+
+
+def ask_choice(store):
+    """Чекає вибору пункту меню.
+
+    Поки користувач думає, незбережені зміни записуються через
+    flush_interval секунд за таймером SIGALRM (де він є), а не лише після
+    наступної дії. Поки програма чекає на input(), дані не змінюються,
+    тож commit() з обробника сигналу безпечний.
+    """
+    store.maybe_flush()
+    timer = hasattr(signal, "SIGALRM") and bool(store.pending)
+    if timer:
+        delay = store.flush_interval - (time.monotonic() - store.last_flush)
+        previous = signal.signal(signal.SIGALRM, lambda signum, frame: store.commit())
+        signal.alarm(max(1, int(delay) + 1))
+    try:
+        return input("Вибір: ").strip()
+    finally:
+        if timer:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, previous)
+
+
 def main():
+    for name in ("SIGHUP", "SIGTERM"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), exit_on_signal)
+
+    store = AttendanceStore()
+    try:
+        menu(store)
+    finally:
+        store.commit()
+
+
+def menu(store):
     while True:
         print("\n--- МЕНЮ ---")
         print("1. Додати студента")
@@ -211,29 +793,47 @@ def main():
         print("5. Внести пропуск")
         print("6. Показати всю таблицю")
         print("7. Показати студента")
+        print("8. Зберегти зміни")
+        print("9. Перейменувати студента")
+        print("10. Підсумки пропусків")
+        print("11. Імпорт пропусків з файлу")
+        print("12. Експорт таблиці у файл")
         print("0. Вихід")
 
-        choice = input("Вибір: ").strip()
+        choice = ask_choice(store)
+        store.refresh()
 
         if choice == "1":
-            add_student()
+            add_student(store)
         elif choice == "2":
-            remove_student()
+            remove_student(store)
         elif choice == "3":
-            add_discipline()
+            add_discipline(store)
         elif choice == "4":
-            remove_discipline()
+            remove_discipline(store)
         elif choice == "5":
-            add_absence()
+            add_absence(store)
         elif choice == "6":
-            show_table()
+            show_table(store)
         elif choice == "7":
-            show_student()
+            show_student(store)
+        elif choice == "8":
+            commit(store)
+        elif choice == "9":
+            rename_student(store)
+        elif choice == "10":
+            show_summary(store)
+        elif choice == "11":
+            import_absences(store)
+        elif choice == "12":
+            export_table(store)
         elif choice == "0":
             break
         else:
             print("Невірний вибір.")
 
+        store.maybe_flush()
+
 
 if __name__ == "__main__":
     main()
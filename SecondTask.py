@@ -1,8 +1,21 @@
 import json
 import os
 import re
+from bisect import bisect_left, bisect_right, insort
 
-FILE = "budget.json"
+from budget_analytics import BudgetAnalytics
+from budget_ledgers import DEFAULT_USER, cross_ledger_report, open_ledger, validate_user_id
+from money import format_money, parse_money, to_minor
+from storage import ConflictError, file_version, quarantine, save_checked, write_atomic
+
+# Старий однокористувацький файл; тепер це початковий бюджет користувача
+# DEFAULT_USER, а FILE вказує на файл поточного користувача в ledgers/.
+LEGACY_FILE = "budget.json"
+FILE = LEGACY_FILE
+
+# Завантажений бюджет живе між викликами меню й перечитується лише тоді,
+# коли budget.json змінили поза цим процесом.
+store = None
 
 # ------------------ Валідація ------------------
 
@@ -14,14 +27,32 @@ def validate_month_format(month: str) -> bool:
 # ------------------ Форматування запису ------------------
 
 def format_budget_record(record: dict) -> str:
-    return f"{record['month']:10}|{record['income']:7}|{record['expenses']:9}"
+    return f"{record['month']:10}|{format_money(record['income']):>7}|{format_money(record['expenses']):>9}"
 
 
 # ------------------ Робота з файлом ------------------
 
+# Суми у файлі — цілі копійки ("units": "kopecks"). Старі файли з сумами
+# в гривнях (float) переводяться автоматично під час першого читання.
+
+def empty_budget() -> dict:
+    return {"units": "kopecks", "records": []}
+
+
+def migrate_budget_data(data: dict) -> bool:
+    if data.get("units") == "kopecks":
+        return False
+
+    for record in data["records"]:
+        record["income"] = to_minor(record["income"])
+        record["expenses"] = to_minor(record["expenses"])
+    data["units"] = "kopecks"
+    return True
+
+
 def load_budget_data():
     if not os.path.exists(FILE):
-        empty = {"records": []}
+        empty = empty_budget()
         save_budget_data(empty)
         return empty
 
@@ -29,89 +60,208 @@ def load_budget_data():
         with open(FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
     except (json.JSONDecodeError, StopIteration):
-        data = {"records": []}
+        print(f"⚠ {FILE} пошкоджено, збережено копію як {quarantine(FILE)}")
+        data = empty_budget()
         save_budget_data(data)
         return data
 
     if "records" not in data:
-        data = {"records": []}
+        print(f"⚠ {FILE} має невідомий формат, збережено копію як {quarantine(FILE)}")
+        data = empty_budget()
         save_budget_data(data)
         return data
 
+    if migrate_budget_data(data):
+        save_budget_data(data)
+
     return data
 
 
-def save_budget_data(data):
-    with open(FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+def save_budget_data(data, version=False):
+    """Атомарно зберігає бюджет.
+
+    Якщо передано version (результат file_version до читання), запис
+    відбудеться лише тоді, коли файл відтоді не змінювався; інакше ConflictError.
+    """
+    text = json.dumps(data, ensure_ascii=False, indent=4)
+    if version is False:
+        write_atomic(FILE, text)
+    else:
+        save_checked(FILE, text, version)
+
+
+# ------------------ Індекс записів ------------------
+
+class BudgetStore:
+    """Записи бюджету з індексами для швидкого доступу.
+
+    by_month — місяць -> запис (перевірка наявності й оновлення за O(1));
+    months — відсортований список місяців для впорядкованого обходу та
+    вибірки проміжків бінарним пошуком.
+    """
+
+    def __init__(self, data: dict, version):
+        self.version = version
+        self.by_month = {r["month"]: r for r in data["records"]}
+        self.months = sorted(self.by_month)
+        self.analytics = BudgetAnalytics(self.by_month.values())
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    def __contains__(self, month: str) -> bool:
+        return month in self.by_month
+
+    def get(self, month: str):
+        return self.by_month.get(month)
+
+    def iter_sorted(self, start: str = None, end: str = None):
+        i = 0 if start is None else bisect_left(self.months, start)
+        j = len(self.months) if end is None else bisect_right(self.months, end)
+        for month in self.months[i:j]:
+            yield self.by_month[month]
+
+    def upsert(self, record: dict) -> bool:
+        """Додає місяць або замінює суми наявного. Повертає True для нового."""
+        month = record["month"]
+        old = self.by_month.get(month)
+
+        if old is None:
+            self.by_month[month] = dict(record)
+            insort(self.months, month)
+            self.analytics.add(record)
+            return True
+
+        self.analytics.update(old, record)
+        old.update(record)
+        return False
+
+    def to_data(self) -> dict:
+        return {"units": "kopecks", "records": list(self.iter_sorted())}
+
+
+def get_store() -> BudgetStore:
+    global store
+
+    if store is None or file_version(FILE) != store.version:
+        version = file_version(FILE)
+        data = load_budget_data()
+        if file_version(FILE) != version:
+            # load_budget_data сам створив або мігрував файл
+            version = file_version(FILE)
+        store = BudgetStore(data, version)
+    return store
+
+
+def save_store(budget: BudgetStore) -> None:
+    """Зберігає зміни; при конфлікті скидає кеш, щоб наступний get_store() перечитав файл."""
+    global store
+
+    try:
+        save_budget_data(budget.to_data(), budget.version)
+    except ConflictError:
+        store = None
+        raise
+    budget.version = file_version(FILE)
 
 
 # ------------------ Додавання запису ------------------
 
-def add_budget_record():
+def ask_budget_record():
     month = input("Місяць (YYYY-MM): ").strip()
     income_input = input("Доходи: ").strip()
     expenses_input = input("Витрати: ").strip()
 
     if not month or not income_input or not expenses_input:
         print("Місяць, доходи та витрати не можуть бути порожніми.")
-        return
+        return None
 
     if not validate_month_format(month):
         print("Невірний формат. Приклад: 2025-11.")
-        return
+        return None
 
-    try:
-        income = float(income_input)
-        expenses = float(expenses_input)
-    except ValueError:
-        print("Доходи та витрати повинні бути числовими.")
+    income = parse_money(income_input)
+    expenses = parse_money(expenses_input)
+    if income is None or expenses is None:
+        print("Доходи та витрати повинні бути числами з не більш ніж двома знаками після коми.")
+        return None
+
+    return {
+        "month": month,
+        "income": income,
+        "expenses": expenses
+    }
+
+
+def add_budget_record():
+    record = ask_budget_record()
+    if record is None:
         return
 
-    data = load_budget_data()
+    while True:
+        budget = get_store()
 
-    for record in data["records"]:
-        if record["month"] == month:
+        if record["month"] in budget:
             print("Запис за цей місяць вже існує.")
             return
 
-    data["records"].append({
-        "month": month,
-        "income": income,
-        "expenses": expenses
-    })
+        budget.upsert(record)
+        try:
+            save_store(budget)
+            break
+        except ConflictError:
+            # Інший процес змінив файл — перечитуємо й пробуємо ще раз
+            continue
 
-    save_budget_data(data)
     print("Запис бюджету додано.")
 
 
+def upsert_budget_record():
+    record = ask_budget_record()
+    if record is None:
+        return
+
+    while True:
+        budget = get_store()
+        created = budget.upsert(record)
+        try:
+            save_store(budget)
+            break
+        except ConflictError:
+            continue
+
+    print("Запис бюджету додано." if created else "Запис бюджету виправлено.")
+
+
 # ------------------ Вивід усієї історії ------------------
 
 def list_budget_records():
-    data = load_budget_data()
+    budget = get_store()
 
-    if not data["records"]:
+    if not len(budget):
         print("Немає записів бюджету.")
         return
 
     print("МІСЯЦЬ     | ДОХОДИ | ВИТРАТИ | ЗАЛИШОК")
     print("-----------------------------------------------")
 
-    for record in data["records"]:
+    for record in budget.iter_sorted():
         balance = record["income"] - record["expenses"]
-        print(f"{record['month']:10}|{record['income']:7}|{record['expenses']:7}|{balance:8}")
+        print(f"{record['month']:10}|{format_money(record['income']):>7}|"
+              f"{format_money(record['expenses']):>7}|{format_money(balance):>8}")
 
 
 # ------------------ Максимальні витрати ------------------
 
 def max_expense_record():
-    data = load_budget_data()
+    budget = get_store()
 
-    if not data["records"]:
+    if not len(budget):
         print("Немає записів бюджету.")
         return
 
-    max_record = max(data["records"], key=lambda r: r["expenses"])
+    month, _ = budget.analytics.top_expenses(1)[0]
+    max_record = budget.get(month)
 
     print("Запис з найбільшими витратами:")
     print("МІСЯЦЬ     | ДОХОДИ | ВИТРАТИ")
@@ -119,14 +269,117 @@ def max_expense_record():
     print(format_budget_record(max_record))
 
 
+# ------------------ Аналітика ------------------
+
+def ask_month(prompt: str):
+    month = input(prompt).strip()
+    if not month:
+        return None
+    if not validate_month_format(month):
+        print("Невірний формат. Приклад: 2025-11.")
+        return False
+    return month
+
+
+def period_summary():
+    stats = get_store().analytics
+    if not len(stats):
+        print("Немає записів бюджету.")
+        return
+
+    start = ask_month("Від місяця (YYYY-MM, порожньо — з початку): ")
+    end = ask_month("До місяця (YYYY-MM, порожньо — до кінця): ")
+    if start is False or end is False:
+        return
+
+    totals = stats.total(start, end)
+    print(f"Місяців: {totals['months']}")
+    print(f"Доходи: {format_money(totals['income'])}")
+    print(f"Витрати: {format_money(totals['expenses'])}")
+    print(f"Залишок: {format_money(totals['balance'])}")
+    print(f"Накопичений залишок на кінець періоду: {format_money(stats.cumulative_balance(end))}")
+
+
+def rolling_averages():
+    stats = get_store().analytics
+    if not len(stats):
+        print("Немає записів бюджету.")
+        return
+
+    end = ask_month("Станом на місяць (YYYY-MM, порожньо — останній): ")
+    if end is False:
+        return
+
+    print("ВІКНО | ДОХОДИ | ВИТРАТИ | ЗАЛИШОК")
+    for window in (3, 6, 12):
+        avg = stats.rolling_average(window, end)
+        if avg is None:
+            print("Немає записів до цього місяця.")
+            return
+        print(f"{window:2} міс.|{format_money(avg['income']):>8}|"
+              f"{format_money(avg['expenses']):>9}|{format_money(avg['balance']):>8}")
+
+
+def top_expense_months():
+    stats = get_store().analytics
+    if not len(stats):
+        print("Немає записів бюджету.")
+        return
+
+    k = input("Скільки місяців показати: ").strip()
+    if not k.isdigit():
+        print("Потрібне ціле число.")
+        return
+
+    for month, expenses in stats.top_expenses(int(k)):
+        print(f"{month:10}|{format_money(expenses):>9}")
+
+
+def all_users_report():
+    workers = os.cpu_count() or 1
+    report = cross_ledger_report(processes=workers)
+    if report is None:
+        print("Немає записів бюджету.")
+        return
+
+    print(f"Користувачів: {report['users']}")
+    print(f"Місяців усього: {report['months']}")
+    print(f"Медіана середньомісячних витрат: {format_money(report['median_monthly_expenses'])}")
+
+
+# ------------------ Користувач ------------------
+
+def choose_user() -> bool:
+    global FILE, store
+
+    user_id = input(f"Користувач (порожньо — {DEFAULT_USER}): ").strip() or DEFAULT_USER
+    if not validate_user_id(user_id):
+        print("Ідентифікатор може містити лише літери, цифри, _ та -.")
+        return False
+
+    legacy = LEGACY_FILE if user_id == DEFAULT_USER else None
+    FILE = open_ledger(user_id, legacy)
+    store = None
+    return True
+
+
 # ------------------ Головне меню ------------------
 
 def main_menu():
+    while not choose_user():
+        pass
+
     while True:
         print("\n=== ЖУРНАЛ СТУДЕНТСЬКОГО БЮДЖЕТУ ===")
         print("1 — Додати новий місяць")
         print("2 — Переглянути історію бюджету")
         print("3 — Місяць з найбільшими витратами")
+        print("4 — Підсумок за період")
+        print("5 — Ковзне середнє (3/6/12 місяців)")
+        print("6 — Топ місяців за витратами")
+        print("7 — Додати або виправити місяць")
+        print("8 — Звіт по всіх користувачах")
+        print("9 — Змінити користувача")
         print("0 — Вийти")
         choice = input("Ваш вибір: ").strip()
 
@@ -136,6 +389,18 @@ def main_menu():
             list_budget_records()
         elif choice == "3":
             max_expense_record()
+        elif choice == "4":
+            period_summary()
+        elif choice == "5":
+            rolling_averages()
+        elif choice == "6":
+            top_expense_months()
+        elif choice == "7":
+            upsert_budget_record()
+        elif choice == "8":
+            all_users_report()
+        elif choice == "9":
+            choose_user()
         elif choice == "0":
             print("Вихід...")
             break
@@ -143,4 +408,5 @@ def main_menu():
             print("Невірний вибір. Спробуйте ще.")
 
 # Запуск програми
-main_menu()
+if __name__ == "__main__":
+    main_menu()
@@ -1,99 +1,617 @@
+import gc
+import heapq
 import os
+import pickle
 import random
+import sys
+import time
+import unicodedata
+from typing import Iterator, Optional
 
+WORDS_FILE = "words.csv"
+WORDS_CACHE = "words.cache"
+SYNONYMS_FILE = "synonyms.csv"
+SESSION_SIZE = 5
+DAY = 24 * 60 * 60
+RETRY_DELAY = 10 * 60  # через скільки секунд повторити слово після помилки
+START_EASE = 2.5
+MIN_EASE = 1.3
+LOG_SYNC_EVERY = 20  # після скількох відповідей журнал скидається на диск (fsync)
+LOG_SYNC_INTERVAL = 30  # або через скільки секунд
+COMPACT_EVERY = 1000  # відповідей у журналі, після яких знімок переписується
+WEIGHT_SCALE = 1_000_000  # ваги вибірки — цілі, щоб суми в дереві були точними
+MAX_EDITS = 2
 
-def loadWords(filename: str) -> dict[str, str]:
+# Результат відповіді; ці ж числа пишуться в журнал
+WRONG, CORRECT, NEAR = 0, 1, 2
+
+
+# ------------------ Словники ------------------
+#
+# Словників може бути кілька, а замість файлу можна передати теку — тоді
+# читаються всі *.csv у ній. Рядок "слово;переклад1;переклад2" дає кілька
+# правильних перекладів; у словнику вони зберігаються одним рядком
+# "переклад1;переклад2" і розбиваються функцією translations.
+# Розібраний словник кешується в words.cache двома суцільними рядками
+# (слова й переклади) — такий файл читається в рази швидше, ніж словник
+# зі списками, — і береться звідти, поки жоден файл-джерело не змінився.
+
+def dictionaryFiles(sources: list[str]) -> list[str]:
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.endswith(".csv"):
+                    files.append(os.path.join(source, name))
+        else:
+            files.append(source)
+    return files
+
+
+def createDefaultWords(filename: str) -> None:
+    f = open(filename, "w", encoding="utf-8")
+    f.write("кіт;cat\n")
+    f.write("собака;dog\n")
+    f.write("будинок;house\n")
+    f.close()
+
+
+def translations(words: dict[str, str], word: str) -> list[str]:
+    return words[word].split(";")
+
+
+def parseWords(files: list[str]) -> dict[str, str]:
     words = {}
-    if not os.path.exists(filename):
-        f = open(filename, "w", encoding="utf-8")
-        f.write("кіт;cat\n")
-        f.write("собака;dog\n")
-        f.write("будинок;house\n")
+    for filename in files:
+        f = open(filename, "r", encoding="utf-8")
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split(";")
+            if len(parts) < 2:
+                continue
+            uk = parts[0].strip().lower()
+            known = words[uk].split(";") if uk in words else []
+            for en in parts[1:]:
+                en = en.strip().lower()
+                if en and en not in known:
+                    known.append(en)
+            if known:
+                words[uk] = ";".join(known)
         f.close()
+    return words
+
+
+def loadWords(sources) -> dict[str, str]:
+    """sources — шлях до словника чи теки або список таких шляхів."""
+    if isinstance(sources, str):
+        sources = [sources]
+    if sources == [WORDS_FILE] and not os.path.exists(WORDS_FILE):
+        createDefaultWords(WORDS_FILE)
+
+    files = [path for path in dictionaryFiles(sources) if os.path.exists(path)]
+    key = []
+    for path in files:
+        st = os.stat(path)
+        key.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+
+    try:
+        f = open(WORDS_CACHE, "rb")
+        cached = pickle.load(f)
+        f.close()
+        if cached["key"] == key:
+            # Збирач сміття марно обходив би сотні тисяч щойно створених рядків
+            gc.disable()
+            try:
+                if not cached["words"]:
+                    return {}
+                return dict(zip(cached["words"].split("\n"), cached["translations"].split("\n")))
+            finally:
+                gc.enable()
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+        pass
+
+    words = parseWords(files)
+    f = open(WORDS_CACHE + ".tmp", "wb")
+    pickle.dump({
+        "key": key,
+        "words": "\n".join(words),
+        "translations": "\n".join(words.values()),
+    }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    f.close()
+    os.replace(WORDS_CACHE + ".tmp", WORDS_CACHE)
+    return words
+
+
+# ------------------ Статистика й журнал відповідей ------------------
+#
+# stats.csv — знімок лічильників [спроб, правильних, майже правильних]; у
+# заголовку записано номер покоління. Старі знімки без третього лічильника
+# теж читаються. Кожна відповідь дописується рядком "слово;час;0/1/2" у
+# журнал stats.csv.<покоління>.log, тож запис відповіді коштує O(1) і не
+# губиться, якщо програма впаде посеред сесії. loadStats складає знімок і
+# журнал його покоління. Коли журнал розростається, знімок переписується
+# з наступним поколінням, а старі журнали лишаються як історія відповідей.
+
+def logPath(filename: str, generation: int) -> str:
+    return f"{filename}.{generation}.log"
+
+
+def statsGeneration(filename: str) -> int:
+    """Покоління знімка з заголовка; 0 для файлів без нього."""
+    if not os.path.exists(filename):
+        return 0
 
     f = open(filename, "r", encoding="utf-8")
+    header = f.readline().strip().split(";")
+    f.close()
+    if len(header) >= 4 and header[-1].startswith("ЖУРНАЛ="):
+        try:
+            return int(header[-1][len("ЖУРНАЛ="):])
+        except ValueError:
+            return 0
+    return 0
+
+
+def iterAnswers(path: str) -> Iterator[tuple]:
+    """Відповіді з журналу: (слово, час, WRONG/CORRECT/NEAR). Обірваний рядок пропускається."""
+    if not os.path.exists(path):
+        return
+
+    f = open(path, "r", encoding="utf-8")
     for line in f:
-        line = line.strip()
-        if not line:
+        parts = line.strip().split(";")
+        if len(parts) != 3 or parts[2] not in ("0", "1", "2"):
             continue
-        parts = line.split(";")
-        if len(parts) != 2:
+        try:
+            timestamp = int(parts[1])
+        except ValueError:
             continue
-        uk, en = parts
-        words[uk.strip().lower()] = en.strip().lower()
+        yield parts[0], timestamp, int(parts[2])
     f.close()
-    return words
 
 
 def loadStats(filename: str) -> dict[str, list[int]]:
     stats = {}
+    if os.path.exists(filename):
+        f = open(filename, "r", encoding="utf-8")
+        for line in f:
+            line = line.strip()
+            if not line or line.lower().startswith("слово"):
+                continue
+            parts = line.split(";")
+            if len(parts) not in (3, 4):
+                continue
+            try:
+                counters = [int(n) for n in parts[1:]]
+            except:
+                continue
+            stats[parts[0].strip().lower()] = (counters + [0])[:3]
+        f.close()
+
+    for word, timestamp, result in iterAnswers(logPath(filename, statsGeneration(filename))):
+        stat = stats.setdefault(word, [0, 0, 0])
+        stat[0] += 1
+        if result == CORRECT:
+            stat[1] += 1
+        elif result == NEAR:
+            stat[2] += 1
+    return stats
+
+
+def saveStats(filename: str, stats: dict[str, list[int]], generation: int = 0) -> None:
+    f = open(filename + ".tmp", "w", encoding="utf-8")
+    f.write(f"СЛОВО_UK;ВСЬОГО_СПРОБ;ПРАВИЛЬНИХ;МАЙЖЕ;ЖУРНАЛ={generation}\n")
+    for word in stats:
+        total, correct, near = stats[word]
+        f.write(f"{word};{total};{correct};{near}\n")
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+    os.replace(filename + ".tmp", filename)
+
+
+class AnswerLog:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.generation = statsGeneration(filename)
+        self.path = logPath(filename, self.generation)
+        self.count = sum(1 for _ in iterAnswers(self.path))
+        self.file = self._open()
+        self.unsynced = 0
+        self.lastSync = time.time()
+
+    def _open(self):
+        f = open(self.path, "a+", encoding="utf-8")
+        # Рядок, обірваний збоєм, закриваємо, щоб не склеїти його з наступним
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+        return f
+
+    def record(self, word: str, result: int, now: int) -> None:
+        self.file.write(f"{word};{now};{result}\n")
+        # flush віддає рядок ОС — відповідь переживе падіння програми;
+        # fsync для збою живлення робиться рідше
+        self.file.flush()
+        self.count += 1
+        self.unsynced += 1
+        if self.unsynced >= LOG_SYNC_EVERY or time.time() - self.lastSync >= LOG_SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self) -> None:
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.lastSync = time.time()
+
+    def compact(self, stats: dict[str, list[int]]) -> None:
+        """Переписує знімок з усіма відповідями й починає нове покоління журналу."""
+        self.sync()
+        saveStats(self.filename, stats, self.generation + 1)
+        self.file.close()
+        self.generation += 1
+        self.path = logPath(self.filename, self.generation)
+        self.count = 0
+        self.file = self._open()
+
+    def close(self) -> None:
+        self.sync()
+        self.file.close()
+
+
+# ------------------ Інтервальні повторення ------------------
+#
+# Для кожного слова зберігається [коли повторити, легкість, інтервал, повторів
+# поспіль]. Правильна відповідь збільшує інтервал (1 день, 6 днів, далі
+# множиться на легкість), помилка повертає слово на початок, як у коробках
+# Лейтнера, і знижує легкість (SM-2). Слова, які пора повторювати, лежать
+# у купі за часом, тож наступне слово береться за O(log n).
+
+def loadSchedule(filename: str) -> dict[str, list]:
+    schedule = {}
     if not os.path.exists(filename):
-        return stats
+        return schedule
 
     f = open(filename, "r", encoding="utf-8")
     for line in f:
-        line = line.strip()
-        if not line or line.lower().startswith("слово"):
+        parts = line.strip().split(";")
+        if len(parts) != 5:
             continue
-        parts = line.split(";")
-        if len(parts) != 3:
-            continue
-        word, total, correct = parts
+        word, due, ease, interval, reps = parts
         try:
-            total = int(total)
-            correct = int(correct)
-        except:
+            schedule[word] = [int(due), float(ease), int(interval), int(reps)]
+        except ValueError:
             continue
-        stats[word.strip().lower()] = [total, correct]
     f.close()
-    return stats
+    return schedule
 
 
-def saveStats(filename: str, stats: dict[str, list[int]]) -> None:
-    f = open(filename, "w", encoding="utf-8")
-    f.write("СЛОВО_UK;ВСЬОГО_СПРОБ;ПРАВИЛЬНИХ\n")
-    for word in stats:
-        total, correct = stats[word]
-        f.write(f"{word};{total};{correct}\n")
+def saveSchedule(filename: str, schedule: dict[str, list]) -> None:
+    f = open(filename + ".tmp", "w", encoding="utf-8")
+    for word, (due, ease, interval, reps) in schedule.items():
+        f.write(f"{word};{due};{ease:.2f};{interval};{reps}\n")
     f.close()
+    os.replace(filename + ".tmp", filename)
+
+
+class Scheduler:
+    def __init__(self, words: dict[str, str], schedule: dict[str, list]):
+        self.words = words
+        self.schedule = schedule
+        self.heap = [(entry[0], word) for word, entry in schedule.items() if word in words]
+        heapq.heapify(self.heap)
+        # Нові слова беруться з ітератора по словнику, без списку всіх ключів
+        self.newWords: Iterator[str] = iter(words)
+
+    def _top(self) -> Optional[tuple]:
+        # У купі можуть лишатися застарілі записи — після повторення слова
+        # туди кладеться новий, а старий викидається тут
+        while self.heap:
+            due, word = self.heap[0]
+            entry = self.schedule.get(word)
+            if entry is not None and entry[0] == due and word in self.words:
+                return self.heap[0]
+            heapq.heappop(self.heap)
+        return None
+
+    def _nextNew(self) -> Optional[str]:
+        for word in self.newWords:
+            if word not in self.schedule:
+                return word
+        return None
+
+    def nextCard(self, now: int) -> Optional[str]:
+        """Слово, яке пора повторити; інакше нове; інакше найближче за часом."""
+        top = self._top()
+        if top is not None and top[0] <= now:
+            return top[1]
+
+        word = self._nextNew()
+        if word is not None:
+            return word
+        return top[1] if top is not None else None
+
+    def review(self, word: str, correct: bool, now: int) -> None:
+        due, ease, interval, reps = self.schedule.get(word, [now, START_EASE, 0, 0])
+
+        if correct:
+            reps += 1
+            if reps == 1:
+                interval = DAY
+            elif reps == 2:
+                interval = 6 * DAY
+            else:
+                interval = int(interval * ease)
+            ease += 0.1
+        else:
+            reps = 0
+            interval = RETRY_DELAY
+            ease = max(MIN_EASE, ease - 0.2)
+
+        due = now + interval
+        self.schedule[word] = [due, ease, interval, reps]
+        heapq.heappush(self.heap, (due, word))
+
+
+# ------------------ Вибірка за помилками ------------------
+#
+# Альтернатива розкладу: слово випадає з імовірністю, пропорційною його
+# згладженій частці помилок (помилки + 1) / (спроби + 2), тож нове слово
+# має вагу 1/2. Відповідь з одруківкою помилкою не вважається. Ваги лежать
+# у дереві Фенвіка: вибір і оновлення ваги після відповіді — O(log n) без
+# перерахунку всього словника.
+
+def errorWeight(stat: Optional[list[int]]) -> int:
+    total, correct, near = stat if stat else (0, 0, 0)
+    return WEIGHT_SCALE * (total - correct - near + 1) // (total + 2)
+
+
+class ErrorSampler:
+    def __init__(self, words: dict[str, str], stats: dict[str, list[int]]):
+        self.stats = stats
+        self.keys = list(words)
+        self.index = {word: i for i, word in enumerate(self.keys)}
+        self.weights = [errorWeight(stats.get(word)) for word in self.keys]
+
+        # Побудова дерева за O(n): кожен вузол передає свою суму батькові
+        self.tree = [0] + self.weights
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def total(self) -> int:
+        result = 0
+        i = len(self.keys)
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def _add(self, i: int, delta: int) -> None:
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _find(self, target: int) -> int:
+        """Найменший індекс, для якого сума ваг до нього включно більша за target."""
+        pos = 0
+        step = 1 << len(self.keys).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+    def nextCard(self, now: int) -> Optional[str]:
+        total = self.total()
+        if total <= 0:
+            return None
+        return self.keys[self._find(random.randrange(total))]
+
+    def review(self, word: str, correct: bool, now: int) -> None:
+        i = self.index.get(word)
+        if i is None:
+            return
+        weight = errorWeight(self.stats.get(word))
+        self._add(i, weight - self.weights[i])
+        self.weights[i] = weight
+
 
+# ------------------ Перевірка відповіді ------------------
+#
+# Відповідь порівнюється після згортання регістру й діакритики. Правильними
+# вважаються всі переклади слова та їхні синоніми з synonyms.csv (рядок —
+# група взаємозамінних слів). Якщо точного збігу немає, шукається переклад
+# на відстані редагування до MAX_EDITS (для коротких слів — менше), і така
+# відповідь зараховується як "майже правильна".
+#
+# Пошук іде за індексом симетричних видалень: для кожного прийнятного
+# варіанта заздалегідь записано всі рядки, що виходять з нього видаленням
+# до MAX_EDITS літер. Кандидати для відповіді — варіанти, з якими вона має
+# спільне видалення, тож перевірка не перебирає всі синоніми. Індекс
+# будується для слова, коли воно вперше трапляється в сесії.
 
-def train(words: dict[str, str], stats: dict[str, list[int]]) -> None:
-    keys = list(words.keys())
+def foldText(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split())
 
-    for i in range(5):
-        word = random.choice(keys)
+
+def allowedEdits(term: str) -> int:
+    # Одна літера в короткому слові часто дає інше слово (cat — car)
+    if len(term) < 4:
+        return 0
+    if len(term) < 8:
+        return min(1, MAX_EDITS)
+    return MAX_EDITS
+
+
+def deletes(term: str, depth: int) -> set[str]:
+    result = {term}
+    frontier = {term}
+    for _ in range(depth):
+        frontier = {t[:i] + t[i + 1:] for t in frontier for i in range(len(t))}
+        result |= frontier
+    return result
+
+
+def editDistance(a: str, b: str, limit: int) -> int:
+    """Відстань Дамерау–Левенштейна (з перестановкою сусідніх літер); limit + 1, якщо більша."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def loadSynonyms(filename: str) -> dict[str, set[str]]:
+    synonyms = {}
+    if not os.path.exists(filename):
+        return synonyms
+
+    f = open(filename, "r", encoding="utf-8")
+    for line in f:
+        group = {foldText(part) for part in line.split(";") if part.strip()}
+        for term in group:
+            synonyms.setdefault(term, set()).update(group)
+    f.close()
+    return synonyms
+
+
+class AnswerMatcher:
+    def __init__(self, words: dict[str, str], synonyms: dict[str, set[str]]):
+        self.words = words
+        self.synonyms = synonyms
+        # слово -> (прийнятні варіанти, видалення -> варіанти)
+        self.indexes: dict[str, tuple] = {}
+
+    def _index(self, word: str) -> tuple:
+        index = self.indexes.get(word)
+        if index is None:
+            accepted = set()
+            for en in translations(self.words, word):
+                en = foldText(en)
+                accepted.add(en)
+                accepted |= self.synonyms.get(en, set())
+
+            byDelete = {}
+            for term in accepted:
+                for d in deletes(term, allowedEdits(term)):
+                    byDelete.setdefault(d, set()).add(term)
+            index = self.indexes[word] = (accepted, byDelete)
+        return index
+
+    def check(self, word: str, answer: str) -> tuple:
+        """(CORRECT/NEAR/WRONG, найближчий прийнятний варіант або None)."""
+        accepted, byDelete = self._index(word)
+        answer = foldText(answer)
+        if answer in accepted:
+            return CORRECT, answer
+
+        candidates = set()
+        for d in deletes(answer, MAX_EDITS):
+            candidates |= byDelete.get(d, set())
+
+        best = None
+        bestDistance = MAX_EDITS + 1
+        for term in candidates:
+            distance = editDistance(answer, term, allowedEdits(term))
+            if distance <= allowedEdits(term) and distance < bestDistance:
+                best, bestDistance = term, distance
+        if best is not None:
+            return NEAR, best
+        return WRONG, None
+
+
+def train(words: dict[str, str], stats: dict[str, list[int]],
+          picker, sessionSize: int = SESSION_SIZE, log: Optional[AnswerLog] = None,
+          matcher: Optional[AnswerMatcher] = None) -> None:
+    """picker — Scheduler або ErrorSampler: дає наступне слово й дізнається про відповідь."""
+    if matcher is None:
+        matcher = AnswerMatcher(words, {})
+    for i in range(sessionSize):
+        word = picker.nextCard(int(time.time()))
+        if word is None:
+            print("Словник порожній")
+            return
         if word not in stats:
-            stats[word] = [0, 0]
+            stats[word] = [0, 0, 0]
 
         answer = input(f"{word}: ").strip().lower()
         stats[word][0] += 1
 
-        if answer == words[word]:
+        result, expected = matcher.check(word, answer)
+        if result == CORRECT:
             print("Правильно")
             stats[word][1] += 1
+        elif result == NEAR:
+            print("Майже правильно, пишеться:", expected)
+            stats[word][2] += 1
         else:
-            print("Неправильно, правильна відповідь:", words[word])
+            print("Неправильно, правильна відповідь:", ", ".join(translations(words, word)))
+        now = int(time.time())
+        picker.review(word, result != WRONG, now)
+        if log is not None:
+            log.record(word, result, now)
 
 
 def showResult(stats: dict[str, list[int]]) -> None:
     print("\nРезультати:")
     for word in stats:
-        total, correct = stats[word]
+        total, correct, near = stats[word]
         if total == 0:
             percent = 0
         else:
             percent = int(correct / total * 100)
-        print(word, "-", correct, "/", total, f"({percent}%)")
+        if near:
+            print(word, "-", correct, "/", total, f"({percent}%), майже правильно: {near}")
+        else:
+            print(word, "-", correct, "/", total, f"({percent}%)")
+
+
+def askSessionSize() -> int:
+    text = input(f"Скільки слів у сесії (Enter — {SESSION_SIZE}): ").strip()
+    if text.isdigit() and int(text) > 0:
+        return int(text)
+    return SESSION_SIZE
 
 
 def main():
-    words = loadWords("words.csv")
+    # python TaskFive.py [словник.csv | тека ...]
+    words = loadWords(sys.argv[1:] or WORDS_FILE)
     stats = loadStats("stats.csv")
+    log = AnswerLog("stats.csv")
+    matcher = AnswerMatcher(words, loadSynonyms(SYNONYMS_FILE))
+
+    mode = input("Режим: 1 — повторення за розкладом, 2 — слабкі слова (Enter — 1): ").strip()
+    if mode == "2":
+        train(words, stats, ErrorSampler(words, stats), askSessionSize(), log, matcher)
+    else:
+        scheduler = Scheduler(words, loadSchedule("schedule.csv"))
+        train(words, stats, scheduler, askSessionSize(), log, matcher)
+        saveSchedule("schedule.csv", scheduler.schedule)
 
-    train(words, stats)
-    saveStats("stats.csv", stats)
+    if log.count >= COMPACT_EVERY:
+        log.compact(stats)
+    log.close()
     showResult(stats)
 
 
-main()
+if __name__ == "__main__":
+    main()
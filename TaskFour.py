@@ -1,55 +1,521 @@
 import csv
+import heapq
+import json
 import os
-from typing import List, Dict
+import struct
+from array import array
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterator, List, Dict, NamedTuple, Optional, Tuple
+
+from binstore import BinaryTable
+from storage import atomic_open, file_lock, file_version, write_atomic
 
 ORDERS_FILE = "orders.csv"
-MENU: Dict[int, Dict[str, int]] = {
+ORDERS_BIN = "orders.bin"
+SEQ_FILE = "orders.seq"
+CATALOG_FILE = "menu.json"
+REPORT_FILE = "orders.report.json"
+CHUNK_SIZE = 65536  # замовлень у одному блоці iter_order_chunks
+NO_TIME = 0xFFFF  # час замовлення невідомий (старі записи)
+
+# Початковий вміст menu.json, якщо каталогу ще немає
+DEFAULT_MENU: Dict[int, Dict[str, int]] = {
     1: {"name": "Кава", "price": 40},
     2: {"name": "Булочка", "price": 25},
     3: {"name": "Сендвіч", "price": 60},
 }
 
-def load_orders() -> List[Dict]:
+
+# ------------------ Каталог страв ------------------
+
+def load_catalog() -> Dict:
+    """{"version": n, "dishes": {id: {"name", "price"}}}; кожна зміна цін збільшує version."""
+    if not os.path.exists(CATALOG_FILE):
+        catalog = {"version": 1, "dishes": dict(DEFAULT_MENU)}
+        save_catalog(catalog)
+        return catalog
+
+    with open(CATALOG_FILE, encoding="utf-8") as f:
+        raw = json.load(f)
+    return {
+        "version": raw["version"],
+        "dishes": {int(k): v for k, v in raw["dishes"].items()},
+    }
+
+
+def save_catalog(catalog: Dict):
+    write_atomic(CATALOG_FILE, json.dumps(catalog, ensure_ascii=False, indent=4))
+
+
+catalog_cache = {"by_name": None, "version": None}
+
+
+def name_index() -> Dict[str, Tuple[int, int]]:
+    """Назва страви -> (ID, ціна) для замовлень старого формату.
+    Будується один раз на версію файлу меню."""
+    version = file_version(CATALOG_FILE)
+    if catalog_cache["by_name"] is None or version != catalog_cache["version"]:
+        dishes = load_catalog()["dishes"]
+        catalog_cache["by_name"] = {d["name"]: (dish_id, d["price"]) for dish_id, d in dishes.items()}
+        catalog_cache["version"] = version
+    return catalog_cache["by_name"]
+
+
+def dish_name(dishes: Dict[int, Dict], dish_id: int) -> str:
+    dish = dishes.get(dish_id)
+    return dish["name"] if dish else f"#{dish_id}"
+
+
+# ------------------ Позиції замовлення ------------------
+#
+# Склад замовлення зберігається як "страва:кількість:ціна,..." — ID страви,
+# кількість і ціна на момент продажу, тож зміна цін у каталозі не змінює історію.
+
+class Line(NamedTuple):
+    dish_id: int
+    qty: int
+    price: int
+
+
+def format_lines(lines: List[Line]) -> str:
+    return ",".join(f"{l.dish_id}:{l.qty}:{l.price}" for l in lines)
+
+
+@lru_cache(maxsize=4096)
+def parse_items(items_str: str) -> Tuple[Line, ...]:
+    """Розбирає склад "страва:кількість:ціна"; однакові кошики розбираються
+    один раз. Пошкоджені позиції пропускаються, як і пошкоджені рядки файлу."""
+    lines = []
+    for part in items_str.split(","):
+        try:
+            dish_id, qty, price = part.split(":")
+            lines.append(Line(int(dish_id), int(qty), int(price)))
+        except ValueError:
+            continue
+    return tuple(lines)
+
+
+def parse_lines(items_str: str, by_name: Dict[str, Tuple[int, int]]) -> Tuple[Line, ...]:
+    """Склад замовлення будь-якого формату; by_name — результат name_index().
+
+    Старий формат не кешується: його ціни залежать від поточного меню.
+    """
+    if ":" in items_str:
+        return parse_items(items_str)
+
+    # Старий формат — назви страв через кому, ціни беремо з каталогу
+    counts = Counter(name for name in items_str.split(",") if name)
+    return tuple(
+        Line(by_name[name][0], qty, by_name[name][1])
+        for name, qty in counts.items() if name in by_name
+    )
+
+
+def describe_lines(lines: Tuple[Line, ...], dishes: Dict[int, Dict]) -> str:
+    return ", ".join(
+        dish_name(dishes, l.dish_id) + (f" ×{l.qty}" if l.qty > 1 else "")
+        for l in lines
+    )
+
+
+class Order(NamedTuple):
+    id: int
+    date: str
+    items_str: str
+    total: float
+    time: int = NO_TIME  # хвилин від півночі
+
+
+class OrderChunk(NamedTuple):
+    ids: array
+    dates: List[str]
+    items: List[str]
+    totals: array
+    times: array
+
+
+# Бінарний формат: id (uint64), дата й склад замовлення як коди словника
+# (uint32), сума (float64), час у хвилинах від півночі (uint16) — 26 байтів
+# на замовлення. Час зберігається числом, а не в рядку дати, щоб словник
+# дат не ріс з кожною хвилиною. Якщо orders.bin існує, саме він є файлом
+# замовлень, а orders.csv більше не читається.
+ORDER_FORMAT = "<QIIdH"
+LEGACY_ORDER_FORMAT = "<QIId"  # до появи часу: 24 байти без останнього поля
+orders_bin = BinaryTable(ORDERS_BIN, ORDER_FORMAT, encoded=(1, 2))
+binary_checked = {"done": False}
+
+
+def use_binary() -> bool:
+    if not orders_bin.exists():
+        return False
+    if not binary_checked["done"]:
+        upgrade_binary()
+        binary_checked["done"] = True
+    return True
+
+
+def upgrade_binary() -> None:
+    """Переписує orders.bin старого формату (без часу) у поточний."""
+    with file_lock(ORDERS_BIN + ".upgrade"):
+        if orders_bin.stored_record_size() != struct.calcsize(LEGACY_ORDER_FORMAT):
+            return
+        legacy = BinaryTable(ORDERS_BIN, LEGACY_ORDER_FORMAT, encoded=(1, 2))
+        orders_bin.write_all(legacy_order(*row) for row in legacy.iter_rows())
+
+
+def legacy_order(order_id: int, date: str, items_str: str, total: float) -> Order:
+    day, time = split_date(date)
+    return Order(order_id, day, items_str, total, time)
+
+
+def parse_time(clock: str) -> int:
+    """"14:30" -> 870; NO_TIME, якщо це не час."""
+    if len(clock) == 5 and clock[2] == ":" and clock[:2].isdigit() and clock[3:].isdigit():
+        return int(clock[:2]) * 60 + int(clock[3:])
+    return NO_TIME
+
+
+def split_date(date: str) -> Tuple[str, int]:
+    """"2025-11-25 14:30" -> ("2025-11-25", 870); записи, де час дописано
+    в дату, трапляються у файлах попередньої версії."""
+    day, _, clock = date.partition(" ")
+    time = parse_time(clock)
+    return (day, time) if time != NO_TIME else (date, NO_TIME)
+
+
+def format_time(minutes: int) -> str:
+    return "" if minutes == NO_TIME else f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def csv_row(o: Order) -> list:
+    return [o.id, o.date, o.items_str, o.total, format_time(o.time)]
+
+
+def iter_orders() -> Iterator[Order]:
+    """Читає замовлення по одному, не тримаючи файл у памʼяті."""
+    if use_binary():
+        for row in orders_bin.iter_rows():
+            yield Order(*row)
+    else:
+        yield from iter_csv_orders()
+
+
+def iter_csv_orders() -> Iterator[Order]:
     if not os.path.exists(ORDERS_FILE):
-        return []
+        return
 
-    orders = []
     with open(ORDERS_FILE, encoding="utf-8") as f:
         reader = csv.reader(f, delimiter=";")
         for row in reader:
-            if len(row) != 4:
+            if len(row) not in (4, 5):
                 continue
             try:
                 order_id = int(row[0])
-                date = row[1]
                 items_str = row[2]
                 total = float(row[3])
             except ValueError:
                 continue
 
-            orders.append({
-                "id": order_id,
-                "date": date,
-                "items_str": items_str,
-                "total": total,
-            })
-    return orders
+            date, time = split_date(row[1])
+            if len(row) == 5 and row[4]:
+                time = parse_time(row[4])
+            yield Order(order_id, date, items_str, total, time)
+
+
+def iter_order_chunks(size: int = CHUNK_SIZE) -> Iterator[OrderChunk]:
+    """Те саме, але блоками по size замовлень у вигляді стовпців."""
+    chunk = OrderChunk(array("Q"), [], [], array("d"), array("H"))
+    for o in iter_orders():
+        chunk.ids.append(o.id)
+        chunk.dates.append(o.date)
+        chunk.items.append(o.items_str)
+        chunk.totals.append(o.total)
+        chunk.times.append(o.time)
+        if len(chunk.ids) == size:
+            yield chunk
+            chunk = OrderChunk(array("Q"), [], [], array("d"), array("H"))
+    if chunk.ids:
+        yield chunk
+
+
+def load_orders() -> List[Dict]:
+    return [o._asdict() for o in iter_orders()]
+
+
+def data_file() -> str:
+    return ORDERS_BIN if use_binary() else ORDERS_FILE
 
 
 def save_order(order: Dict):
-    """Дописує одне замовлення в кінець файлу."""
-    with open(ORDERS_FILE, "a", encoding="utf-8", newline="") as f:
+    """Дописує одне замовлення в кінець файлу й оновлює звіт продажів."""
+    save_orders([order])
+
+
+def save_orders(orders: List[Dict]):
+    """Дописує кілька замовлень одним записом з одним fsync і оновлює звіт."""
+    rows = [Order(o["id"], o["date"], o["items_str"], o["total"], o.get("time", NO_TIME)) for o in orders]
+
+    with file_lock(REPORT_FILE):
+        # Звіт — лише похідні дані: його помилка не повинна зупиняти
+        # запис замовлень, а після запису — скасовувати вже збережені
+        try:
+            report = current_report()
+        except Exception:
+            report = None
+
+        if use_binary():
+            orders_bin.append_many(rows)
+        else:
+            with open(ORDERS_FILE, "a", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerows(csv_row(o) for o in rows)
+                f.flush()
+                os.fsync(f.fileno())
+
+        if report is None:
+            return
+        try:
+            by_name = name_index()
+            for row in rows:
+                report.add(row, by_name)
+            # Файл замовлень дописуємо лише під цим блокуванням, тож
+            # звіт тепер відповідає саме його поточній версії
+            report.source = report_source()
+            report.save()
+        except Exception:
+            # Наступний запит перерахує звіт з файлу замовлень
+            report_cache["report"] = None
+
+
+def last_order_id() -> int:
+    """ID останнього замовлення у файлі — читається лише кінець файлу."""
+    if use_binary():
+        row = orders_bin.last_row()
+        return row[0] if row else 0
+
+    if not os.path.exists(ORDERS_FILE):
+        return 0
+
+    with open(ORDERS_FILE, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        block = 4096
+        while True:
+            start = max(0, end - block)
+            f.seek(start)
+            lines = f.read(end - start).splitlines()
+            if start > 0:
+                # Перший рядок блоку може бути обрізаним
+                lines = lines[1:]
+            for line in reversed(lines):
+                row = next(csv.reader([line.decode("utf-8", "replace")], delimiter=";"), [])
+                if len(row) in (4, 5) and row[0].isdigit():
+                    return int(row[0])
+            if start == 0:
+                return 0
+            block *= 2
+
+
+def reserve_order_ids(count: int = 1) -> int:
+    """Резервує count послідовних ID і повертає перший з них.
+
+    Викликається лише під file_lock(SEQ_FILE). Якщо лічильник втрачено чи
+    він відстає від файлу замовлень, продовжуємо від останнього ID у файлі.
+    """
+    try:
+        with open(SEQ_FILE, encoding="utf-8") as f:
+            last = int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        last = 0
+
+    last = max(last, last_order_id())
+    write_atomic(SEQ_FILE, str(last + count))
+    return last + 1
+
+
+def save_new_orders(orders: List[Dict]):
+    """Призначає замовленням ID і дописує їх у файл.
+
+    Резервування й запис відбуваються під одним блокуванням лічильника,
+    тож різні процеси ніколи не отримають однаковий ID, а ID у файлі завжди
+    зростають — останній рядок справді містить найбільший ID.
+    """
+    with file_lock(SEQ_FILE):
+        first = reserve_order_ids(len(orders))
+        for i, order in enumerate(orders):
+            order["id"] = first + i
+        save_orders(orders)
+
+
+# ------------------ Звіт продажів ------------------
+#
+# Агрегати (виручка по днях, стравах і годинах, розмір кошика) зберігаються
+# в orders.report.json разом із версією файлу замовлень, з якого їх пораховано.
+# save_order оновлює їх на кожне замовлення; якщо файл замовлень змінили в
+# обхід save_order, звіт один раз перераховується повним проходом.
+
+class SalesReport:
+    def __init__(self, source=None):
+        self.source = source
+        self.orders = 0
+        self.revenue = 0.0
+        self.items = 0
+        self.by_day: Dict[str, float] = {}
+        self.by_hour: Dict[int, float] = {}
+        # страва -> [кількість, виручка]
+        self.by_dish: Dict[int, List] = {}
+
+    @classmethod
+    def build(cls) -> "SalesReport":
+        # Версію беремо до проходу: замовлення, дописані під час нього,
+        # зроблять звіт застарілим, а не загубляться
+        report = cls(report_source())
+        by_name = name_index()
+        for o in iter_orders():
+            report.add(o, by_name)
+        return report
+
+    @classmethod
+    def from_json(cls, raw: Dict) -> "SalesReport":
+        report = cls(raw["source"])
+        report.orders = raw["orders"]
+        report.revenue = raw["revenue"]
+        report.items = raw["items"]
+        report.by_day = raw["by_day"]
+        report.by_hour = {int(h): v for h, v in raw["by_hour"].items()}
+        report.by_dish = {int(d): v for d, v in raw["by_dish"].items()}
+        return report
+
+    def to_json(self) -> Dict:
+        return {
+            "source": self.source,
+            "orders": self.orders,
+            "revenue": self.revenue,
+            "items": self.items,
+            "by_day": self.by_day,
+            "by_hour": self.by_hour,
+            "by_dish": self.by_dish,
+        }
+
+    def is_current(self) -> bool:
+        return self.source == report_source()
+
+    def add(self, order: Order, by_name: Dict[str, Tuple[int, int]]) -> None:
+        lines = parse_lines(order.items_str, by_name)
+
+        self.orders += 1
+        self.revenue += order.total
+        self.items += sum(l.qty for l in lines)
+        self.by_day[order.date] = self.by_day.get(order.date, 0) + order.total
+        if order.time != NO_TIME:
+            hour = order.time // 60
+            self.by_hour[hour] = self.by_hour.get(hour, 0) + order.total
+        for l in lines:
+            dish = self.by_dish.setdefault(l.dish_id, [0, 0])
+            dish[0] += l.qty
+            dish[1] += l.qty * l.price
+
+    def save(self) -> None:
+        """Записує звіт; викликається лише під file_lock(REPORT_FILE)."""
+        write_atomic(REPORT_FILE, json.dumps(self.to_json()))
+        report_cache["report"] = self
+        report_cache["version"] = file_version(REPORT_FILE)
+
+    def top_dishes(self, n: int) -> List[Tuple[int, int, int]]:
+        """n страв з найбільшою виручкою: (страва, кількість, виручка)."""
+        return heapq.nlargest(n, ((d, q, r) for d, (q, r) in self.by_dish.items()), key=lambda t: t[2])
+
+    def average_basket(self) -> Tuple[float, float]:
+        """Середня кількість страв і середня сума замовлення."""
+        if not self.orders:
+            return 0.0, 0.0
+        return self.items / self.orders, self.revenue / self.orders
+
+
+report_cache = {"report": None, "version": None}
+
+
+def report_source() -> List:
+    """Файл замовлень і його версія у тому вигляді, в якому їх зберігає JSON."""
+    version = file_version(data_file())
+    return [data_file(), list(version) if version else None]
+
+
+def read_report() -> Optional[SalesReport]:
+    """Звіт з памʼяті; файл перечитується лише якщо його змінили."""
+    version = file_version(REPORT_FILE)
+    report = report_cache["report"]
+    if report is not None and version == report_cache["version"]:
+        return report
+    if version is None:
+        return None
+
+    try:
+        with open(REPORT_FILE, encoding="utf-8") as f:
+            report = SalesReport.from_json(json.load(f))
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return None
+    report_cache["report"] = report
+    report_cache["version"] = version
+    return report
+
+
+def current_report() -> SalesReport:
+    """Актуальний звіт; викликається лише під file_lock(REPORT_FILE)."""
+    report = read_report()
+    if report is None or not report.is_current():
+        report = SalesReport.build()
+        report.save()
+    return report
+
+
+def get_report() -> SalesReport:
+    """Звіт для читання. Перераховується лише якщо змінився файл замовлень,
+    і тоді під блокуванням, щоб не затерти звіт, який саме оновлює save_orders."""
+    report = read_report()
+    if report is not None and report.is_current():
+        return report
+    with file_lock(REPORT_FILE):
+        return current_report()
+
+
+def convert_to_binary() -> int:
+    return orders_bin.write_all(iter_csv_orders())
+
+
+def convert_to_csv() -> int:
+    count = 0
+    with atomic_open(ORDERS_FILE) as f:
         writer = csv.writer(f, delimiter=";")
-        writer.writerow([
-            order["id"],
-            order["date"],
-            order["items_str"],
-            order["total"],
-        ])
+        for o in iter_orders():
+            writer.writerow(csv_row(o))
+            count += 1
+    os.remove(ORDERS_BIN)
+    os.remove(orders_bin.dict_path)
+    return count
+
+
+def switch_to_binary():
+    if use_binary():
+        print("Вже використовується бінарний формат")
+        return
+    count = convert_to_binary()
+    print(f" {count} замовлень перенесено в {ORDERS_BIN}; {ORDERS_FILE} більше не використовується")
+
+
+def switch_to_csv():
+    if not use_binary():
+        print("Вже використовується CSV")
+        return
+    count = convert_to_csv()
+    print(f" {count} замовлень перенесено в {ORDERS_FILE}")
+
 
 def show_menu():
-    print("Меню:")
-    for num, item in MENU.items():
+    catalog = load_catalog()
+    print(f"Меню (версія {catalog['version']}):")
+    for num, item in catalog["dishes"].items():
         print(f"{num}. {item['name']} — {item['price']} грн")
 
 
@@ -61,6 +527,7 @@ def create_order():
 
     print("Введіть номери страв через пробіл (напр. 1 2 2):")
     show_menu()
+    dishes = load_catalog()["dishes"]
     items_input = input("Номери страв: ").strip()
 
     if not items_input:
@@ -74,56 +541,146 @@ def create_order():
         except ValueError:
             print(f" '{p}' — не число")
             return
-        if n not in MENU:
+        if n not in dishes:
             print(f" Страви з номером {n} немає в меню")
             return
         dish_numbers.append(n)
-    dish_names: List[str] = []
-    total = 0
-    for n in dish_numbers:
-        dish_names.append(MENU[n]["name"])
-        total += MENU[n]["price"]
-
-    items_str = ",".join(dish_names)
-    orders = load_orders()
-    if orders:
-        max_id = max(o["id"] for o in orders)
-    else:
-        max_id = 0
-    new_id = max_id + 1
 
+    lines = [Line(n, qty, dishes[n]["price"]) for n, qty in Counter(dish_numbers).items()]
+    total = sum(l.qty * l.price for l in lines)
+
+    items_str = format_lines(lines)
+
+    now = datetime.now()
     order = {
-        "id": new_id,
         "date": date,
+        # Час замовлення потрібен для звіту по годинах
+        "time": now.hour * 60 + now.minute,
         "items_str": items_str,
         "total": total,
     }
 
-    print(f"Ви замовили: {items_str}")
+    print(f"Ви замовили: {describe_lines(tuple(lines), dishes)}")
     print(f"Сума: {total} грн")
-    save_order(order)
-    print(f" Замовлення збережено як ID={new_id}")
+    save_new_orders([order])
+    print(f" Замовлення збережено як ID={order['id']}")
 
 
 def list_orders():
-    orders = load_orders()
-    if not orders:
+    dishes = load_catalog()["dishes"]
+    by_name = name_index()
+    shown = False
+    for o in iter_orders():
+        if not shown:
+            print("Історія замовлень:")
+            shown = True
+        when = f"{o.date} {format_time(o.time)}".strip()
+        print(f"{o.id} — {when} — {describe_lines(parse_lines(o.items_str, by_name), dishes)} — {o.total} грн")
+
+    if not shown:
+        print("Замовлень немає")
+
+
+def total_revenue():
+    report = get_report()
+    if not report.orders:
         print("Замовлень немає")
         return
 
-    print("Історія замовлень:")
-    for o in orders:
-        print(f"{o['id']} — {o['date']} — {o['items_str']} — {o['total']} грн")
+    print(f"Загальна виручка: {report.revenue} грн")
 
 
-def total_revenue():
-    orders = load_orders()
-    if not orders:
+def show_sales_report():
+    report = get_report()
+    if not report.orders:
         print("Замовлень немає")
         return
 
-    total = sum(o["total"] for o in orders)
-    print(f"Загальна виручка: {total} грн")
+    dishes = load_catalog()["dishes"]
+    items, value = report.average_basket()
+    print(f"Замовлень: {report.orders}, виручка: {report.revenue} грн")
+    print(f"Середній кошик: {items:.2f} страв на {value:.2f} грн")
+
+    print("Виручка по днях:")
+    for day in sorted(report.by_day)[-7:]:
+        print(f"{day} — {report.by_day[day]} грн")
+
+    if report.by_hour:
+        print("Виручка по годинах:")
+        for hour in sorted(report.by_hour):
+            print(f"{hour:02d}:00 — {report.by_hour[hour]} грн")
+
+    print("Топ-3 страви:")
+    for dish_id, qty, revenue in report.top_dishes(3):
+        print(f"{dish_name(dishes, dish_id)} — {qty} шт — {revenue} грн")
+
+
+def dish_stats() -> Dict:
+    """Один прохід по замовленнях: виручка й кількість по стравах та склад кошиків."""
+    revenue: Counter = Counter()
+    quantity: Counter = Counter()
+    basket_sizes: Counter = Counter()
+    combos: Counter = Counter()
+    orders = 0
+
+    by_name = name_index()
+    for o in iter_orders():
+        lines = parse_lines(o.items_str, by_name)
+        orders += 1
+        basket_sizes[sum(l.qty for l in lines)] += 1
+        combos[tuple(sorted(l.dish_id for l in lines))] += 1
+        for l in lines:
+            revenue[l.dish_id] += l.qty * l.price
+            quantity[l.dish_id] += l.qty
+
+    return {
+        "orders": orders,
+        "revenue": revenue,
+        "quantity": quantity,
+        "basket_sizes": basket_sizes,
+        "combos": combos,
+    }
+
+
+def show_dish_stats():
+    stats = dish_stats()
+    if not stats["orders"]:
+        print("Замовлень немає")
+        return
+
+    dishes = load_catalog()["dishes"]
+    print("Страва — продано — виручка")
+    for dish_id, revenue in stats["revenue"].most_common():
+        print(f"{dish_name(dishes, dish_id)} — {stats['quantity'][dish_id]} шт — {revenue} грн")
+
+    print("Розмір кошика — замовлень")
+    for size, n in sorted(stats["basket_sizes"].items()):
+        print(f"{size} — {n}")
+
+    print("Найчастіші набори страв:")
+    for combo, n in stats["combos"].most_common(5):
+        print(f"{', '.join(dish_name(dishes, d) for d in combo)} — {n}")
+
+
+def change_price():
+    catalog = load_catalog()
+    show_menu()
+    try:
+        dish_id = int(input("Номер страви: ").strip())
+        price = int(input("Нова ціна, грн: ").strip())
+    except ValueError:
+        print(" Потрібне ціле число")
+        return
+
+    if dish_id not in catalog["dishes"] or price <= 0:
+        print(" Невірні дані")
+        return
+
+    catalog["dishes"][dish_id]["price"] = price
+    catalog["version"] += 1
+    save_catalog(catalog)
+    print(f" Ціну змінено, версія меню {catalog['version']}")
+
 
 def main_menu():
     actions = {
@@ -131,6 +688,11 @@ def main_menu():
         "2": create_order,
         "3": list_orders,
         "4": total_revenue,
+        "5": switch_to_binary,
+        "6": switch_to_csv,
+        "7": show_dish_stats,
+        "8": change_price,
+        "9": show_sales_report,
         "0": exit,
     }
 
@@ -139,6 +701,11 @@ def main_menu():
         print("2 — Створити замовлення")
         print("3 — Переглянути всі замовлення")
         print("4 — Показати загальну виручку")
+        print("5 — Перейти на бінарний формат")
+        print("6 — Повернутися до CSV")
+        print("7 — Статистика по стравах")
+        print("8 — Змінити ціну страви")
+        print("9 — Звіт продажів")
         print("0 — Вийти")
         choice = input("Ваш вибір: ").strip()
         action = actions.get(choice)
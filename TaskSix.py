@@ -1,6 +1,9 @@
+import copy
 import os
 import random
 
+from storage import ConflictError, file_version, save_checked
+
 
 def ensureFile(filename: str) -> None:
     if os.path.exists(filename):
@@ -43,12 +46,40 @@ def loadPoll(filename: str) -> dict[str, list[list]]:
     return data
 
 
-def savePoll(filename: str, data: dict[str, list[list]]) -> None:
-    f = open(filename, "w", encoding="utf-8")
+def savePoll(filename: str, data: dict[str, list[list]], version) -> None:
+    # version — file_version(filename) на момент читання; при розбіжності ConflictError
+    lines = []
     for q in data:
         for opt, votes in data[q]:
-            f.write(f"{q};{opt};{votes}\n")
-    f.close()
+            lines.append(f"{q};{opt};{votes}\n")
+    save_checked(filename, "".join(lines), version)
+
+
+def mergePoll(current: dict[str, list[list]], original: dict[str, list[list]],
+              data: dict[str, list[list]]) -> dict[str, list[list]]:
+    # Переносить зміни цієї сесії (data відносно original) поверх current,
+    # який тим часом зберіг інший процес: нові питання та прирости голосів.
+    merged = copy.deepcopy(current)
+    for q in data:
+        if q not in merged:
+            merged[q] = copy.deepcopy(data[q])
+            continue
+
+        before = {}
+        for opt, votes in original.get(q, []):
+            before[opt] = votes
+
+        for opt, votes in data[q]:
+            delta = votes - before.get(opt, 0)
+            if delta == 0:
+                continue
+            for pair in merged[q]:
+                if pair[0] == opt:
+                    pair[1] += delta
+                    break
+            else:
+                merged[q].append([opt, delta])
+    return merged
 
 
 def chooseQuestion(data: dict[str, list[list]]) -> str:
@@ -155,7 +186,10 @@ def showResults(data: dict[str, list[list]]) -> None:
 
 def main():
     filename = "poll.csv"
+    ensureFile(filename)
+    version = file_version(filename)
     data = loadPoll(filename)
+    original = copy.deepcopy(data)
 
     changed = False
 
@@ -178,8 +212,16 @@ def main():
         elif choice == "4":
             break
 
-    if changed:
-        savePoll(filename, data)
+    while changed:
+        try:
+            savePoll(filename, data, version)
+            break
+        except ConflictError:
+            # Файл змінив інший термінал — додаємо свої зміни до його версії
+            version = file_version(filename)
+            current = loadPoll(filename)
+            data = mergePoll(current, original, data)
+            original = current
 
 
 main()
@@ -1,31 +1,48 @@
 import csv
+import json
+import math
 import os
 import re
-from typing import List, Dict
+from array import array
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import date as Date
+from functools import partial
+from typing import Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
+
+from binstore import BinaryTable
+from storage import atomic_open, file_version, write_atomic
 
 FILE = "grades.csv"
+BIN_FILE = "grades.bin"
+INDEX_FILE = "grades.idx.json"
+CHUNK_SIZE = 65536  # grades per chunk in iter_grade_chunks
 
 # ------------------ ECTS ------------------
 
+# Lower bounds of each letter after F; ECTS_LETTERS[i] covers scores
+# from ECTS_THRESHOLDS[i - 1] up to ECTS_THRESHOLDS[i].
+ECTS_THRESHOLDS = [35, 60, 64, 74, 82, 90]
+ECTS_LETTERS = ["F", "FX", "E", "D", "C", "B", "A"]
+
 def ects_letter(score: float) -> str:
-    if score >= 90:
-        return "A"
-    if score >= 82:
-        return "B"
-    if score >= 74:
-        return "C"
-    if score >= 64:
-        return "D"
-    if score >= 60:
-        return "E"
-    if score >= 35:
-        return "FX"
-    return "F"
+    return ECTS_LETTERS[bisect_right(ECTS_THRESHOLDS, score)]
+
+def ects_letters(scores: Iterable[float]) -> List[str]:
+    bucket = partial(bisect_right, ECTS_THRESHOLDS)
+    return list(map(ECTS_LETTERS.__getitem__, map(bucket, scores)))
 
 # ------------------ Validation ------------------
 
 def validate_date(date: str) -> bool:
-    return bool(re.match(r"^\d{4}-(0[1-9]|1[0-2])-([0][1-9]|[12][0-9]|3[01])$", date))
+    if not re.match(r"^\d{4}-(0[1-9]|1[0-2])-([0][1-9]|[12][0-9]|3[01])$", date):
+        return False
+    # The pattern alone lets through dates such as 2025-02-31
+    try:
+        Date.fromisoformat(date)
+    except ValueError:
+        return False
+    return True
 
 def validate_score(score: str) -> bool:
     try:
@@ -36,22 +53,350 @@ def validate_score(score: str) -> bool:
 
 # ------------------ File I/O ------------------
 
-def load_grades() -> List[Dict]:
+class Grade(NamedTuple):
+    subject: str
+    date: str
+    score: float
+
+class GradeChunk(NamedTuple):
+    subjects: List[str]
+    dates: List[str]
+    scores: array
+
+# Binary backend: subject and date are dictionary-encoded (uint32 codes),
+# the score is a float64 — 16 bytes per grade. When grades.bin exists it
+# is the data file and grades.csv is no longer read.
+grades_bin = BinaryTable(BIN_FILE, "<IId", encoded=(0, 1))
+
+def use_binary() -> bool:
+    return grades_bin.exists()
+
+def data_file() -> str:
+    return BIN_FILE if use_binary() else FILE
+
+def iter_csv_grades() -> Iterator[Grade]:
     if not os.path.exists(FILE):
-        return []
+        return
 
     with open(FILE, encoding="utf-8") as f:
-        reader = csv.reader(f, delimiter=";")
-        return [
-            {"subject": r[0], "date": r[1], "score": float(r[2])}
-            for r in reader if len(r) == 3
-        ]
+        for r in csv.reader(f, delimiter=";"):
+            if len(r) == 3:
+                yield Grade(r[0], r[1], float(r[2]))
+
+def iter_grades() -> Iterator[Grade]:
+    """Streams grades one record at a time from the active backend."""
+    if use_binary():
+        for row in grades_bin.iter_rows():
+            yield Grade(*row)
+    else:
+        yield from iter_csv_grades()
+
+def iter_grade_chunks(size: int = CHUNK_SIZE) -> Iterator[GradeChunk]:
+    """Streams grades as column chunks of at most `size` grades."""
+    chunk = GradeChunk([], [], array("d"))
+    for g in iter_grades():
+        chunk.subjects.append(g.subject)
+        chunk.dates.append(g.date)
+        chunk.scores.append(g.score)
+        if len(chunk.scores) == size:
+            yield chunk
+            chunk = GradeChunk([], [], array("d"))
+    if chunk.scores:
+        yield chunk
+
+def load_grades() -> List[Dict]:
+    return [g._asdict() for g in iter_grades()]
 
 def save_grade(record: Dict):
+    if use_binary():
+        grades_bin.append((record["subject"], record["date"], record["score"]))
+        return
+
     with open(FILE, "a", encoding="utf-8", newline="") as f:
         writer = csv.writer(f, delimiter=";")
         writer.writerow([record["subject"], record["date"], record["score"]])
 
+def convert_to_binary() -> int:
+    return grades_bin.write_all(iter_csv_grades())
+
+def convert_to_csv() -> int:
+    count = 0
+    with atomic_open(FILE) as f:
+        writer = csv.writer(f, delimiter=";")
+        for g in iter_grades():
+            writer.writerow(g)
+            count += 1
+    os.remove(BIN_FILE)
+    os.remove(grades_bin.dict_path)
+    return count
+
+# ------------------ Batch statistics ------------------
+
+def load_score_columns() -> Tuple[List[str], array, array]:
+    """Returns (subject names, subject code per grade, score per grade)."""
+    names: List[str] = []
+    codes_by_name: Dict[str, int] = {}
+    codes = array("I")
+    scores = array("d")
+
+    for chunk in iter_grade_chunks():
+        for subject in chunk.subjects:
+            code = codes_by_name.get(subject)
+            if code is None:
+                code = codes_by_name[subject] = len(names)
+                names.append(subject)
+            codes.append(code)
+        scores.extend(chunk.scores)
+
+    return names, codes, scores
+
+def ects_histogram(sorted_scores: array) -> Dict[str, int]:
+    # One binary search per threshold over the sorted scores instead of
+    # classifying every score separately.
+    cuts = [0] + [bisect_left(sorted_scores, t) for t in ECTS_THRESHOLDS] + [len(sorted_scores)]
+    return {letter: cuts[i + 1] - cuts[i] for i, letter in enumerate(ECTS_LETTERS)}
+
+def percentile(sorted_scores: array, p: float) -> float:
+    """Linear-interpolated p-th percentile (0–100) of already sorted scores."""
+    pos = (len(sorted_scores) - 1) * p / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_scores) - 1)
+    return sorted_scores[lo] + (sorted_scores[hi] - sorted_scores[lo]) * (pos - lo)
+
+def group_means(codes: array, scores: array, groups: int) -> List[Optional[float]]:
+    sums = [0.0] * groups
+    counts = [0] * groups
+    for code, score in zip(codes, scores):
+        sums[code] += score
+        counts[code] += 1
+    return [s / c if c else None for s, c in zip(sums, counts)]
+
+# ------------------ Aggregates ------------------
+
+class GradeStore:
+    """Running per-subject aggregates over grades.csv.
+
+    Each subject keeps [count, sum, sum of squares] and a count per ECTS
+    letter, so averages, standard deviation and the ECTS distribution are
+    answered without touching the CSV. The aggregates are cached in
+    INDEX_FILE together with the version of the data file they describe.
+    """
+
+    def __init__(self):
+        self.subjects: Dict[str, List[float]] = {}
+        self.letters: Dict[str, Dict[str, int]] = {}
+        self.source = None
+
+    @classmethod
+    def load(cls) -> "GradeStore":
+        store = cls()
+        version = file_version(data_file())
+
+        try:
+            with open(INDEX_FILE, encoding="utf-8") as f:
+                index = json.load(f)
+            if index["source"] is not None and tuple(index["source"]) == version:
+                store.subjects = index["subjects"]
+                store.letters = index["letters"]
+                store.source = version
+                return store
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            pass
+
+        for g in iter_grades():
+            store.add(g.subject, g.score)
+        store.source = version
+        store.save()
+        return store
+
+    def save(self):
+        index = {"source": self.source, "subjects": self.subjects, "letters": self.letters}
+        write_atomic(INDEX_FILE, json.dumps(index, ensure_ascii=False))
+
+    def add(self, subject: str, score: float):
+        acc = self.subjects.setdefault(subject, [0, 0.0, 0.0])
+        acc[0] += 1
+        acc[1] += score
+        acc[2] += score ** 2
+
+        letters = self.letters.setdefault(subject, {})
+        letter = ects_letter(score)
+        letters[letter] = letters.get(letter, 0) + 1
+
+    def append(self, record: Dict):
+        """Appends a grade to grades.csv and updates the aggregates in place."""
+        current = file_version(data_file()) == self.source
+        save_grade(record)
+        if current:
+            self.add(record["subject"], record["score"])
+            self.source = file_version(data_file())
+            self.save()
+
+    def totals(self, subject: Optional[str] = None) -> List[float]:
+        if subject is not None:
+            return self.subjects.get(subject, [0, 0.0, 0.0])
+        total = [0, 0.0, 0.0]
+        for acc in self.subjects.values():
+            total = [a + b for a, b in zip(total, acc)]
+        return total
+
+    def stats(self, subject: Optional[str] = None) -> Optional[Dict[str, float]]:
+        count, total, squares = self.totals(subject)
+        if not count:
+            return None
+        mean = total / count
+        return {
+            "count": count,
+            "mean": mean,
+            "std": math.sqrt(max(0.0, squares / count - mean ** 2)),
+        }
+
+    def distribution(self, subject: Optional[str] = None) -> Dict[str, int]:
+        if subject is not None:
+            return dict(self.letters.get(subject, {}))
+        result: Dict[str, int] = {}
+        for letters in self.letters.values():
+            for letter, n in letters.items():
+                result[letter] = result.get(letter, 0) + n
+        return result
+
+
+store: Optional[GradeStore] = None
+
+
+def get_store() -> GradeStore:
+    global store
+    if store is None or file_version(data_file()) != store.source:
+        store = GradeStore.load()
+    return store
+
+# ------------------ Timeline ------------------
+
+def date_ordinal(date: str) -> int:
+    return Date.fromisoformat(date).toordinal()
+
+def month_bounds(month: str) -> Tuple[int, int]:
+    year, mon = int(month[:4]), int(month[5:7])
+    return Date(year, mon, 1).toordinal(), Date(year, mon, monthrange(year, mon)[1]).toordinal()
+
+class GradeTimeline:
+    """Grades per subject sorted by date, with prefix sums of scores.
+
+    Dates are parsed once into ordinals; a date range is located with two
+    binary searches and its sum is a difference of two prefix sums, so a
+    query costs O(log n). Monthly rollups are cached per subject until a
+    grade for that subject is added.
+    """
+
+    def __init__(self):
+        self.days: Dict[str, array] = {}
+        self.prefix: Dict[str, array] = {}
+        self.monthly_cache: Dict[str, List[Tuple[str, int, float]]] = {}
+        self.source = None
+
+    @classmethod
+    def build(cls) -> "GradeTimeline":
+        timeline = cls()
+        timeline.source = file_version(data_file())
+
+        per_subject: Dict[str, List[Tuple[int, float]]] = {}
+        for g in iter_grades():
+            try:
+                day = date_ordinal(g.date)
+            except ValueError:
+                continue
+            per_subject.setdefault(g.subject, []).append((day, g.score))
+
+        for subject, rows in per_subject.items():
+            rows.sort()
+            days = array("I", (day for day, _ in rows))
+            prefix = array("d", [0.0])
+            for _, score in rows:
+                prefix.append(prefix[-1] + score)
+            timeline.days[subject] = days
+            timeline.prefix[subject] = prefix
+        return timeline
+
+    def add(self, record: Dict):
+        days = self.days.setdefault(record["subject"], array("I"))
+        prefix = self.prefix.setdefault(record["subject"], array("d", [0.0]))
+        day = date_ordinal(record["date"])
+        score = record["score"]
+
+        i = bisect_right(days, day)
+        days.insert(i, day)
+        prefix.insert(i + 1, prefix[i])
+        # Grades are usually added in date order, so this loop is short
+        for j in range(i + 1, len(prefix)):
+            prefix[j] += score
+
+        self.monthly_cache.pop(record["subject"], None)
+
+    def range_stats(self, subject: str, start: int, end: int) -> Tuple[int, float]:
+        """(count, sum) of grades for subject with start <= day <= end."""
+        days = self.days.get(subject)
+        if not days:
+            return 0, 0.0
+        i = bisect_left(days, start)
+        j = bisect_right(days, end)
+        if j <= i:
+            return 0, 0.0
+        prefix = self.prefix[subject]
+        return j - i, prefix[j] - prefix[i]
+
+    def monthly(self, subject: str) -> List[Tuple[str, int, float]]:
+        """[(YYYY-MM, count, sum)] for every month that has grades."""
+        cached = self.monthly_cache.get(subject)
+        if cached is not None:
+            return cached
+
+        rollup: List[Tuple[str, int, float]] = []
+        days = self.days.get(subject, array("I"))
+        i = 0
+        while i < len(days):
+            first = Date.fromordinal(days[i])
+            month = f"{first.year:04}-{first.month:02}"
+            _, last_day = month_bounds(month)
+            j = bisect_right(days, last_day, i)
+            prefix = self.prefix[subject]
+            rollup.append((month, j - i, prefix[j] - prefix[i]))
+            i = j
+
+        self.monthly_cache[subject] = rollup
+        return rollup
+
+    def moving_average(self, subject: str, window: int = 3,
+                       start: Optional[str] = None, end: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Average over the last `window` months with grades, for each month in start..end."""
+        rollup = self.monthly(subject)
+        result = []
+        for k, (month, _, _) in enumerate(rollup):
+            if (start and month < start) or (end and month > end):
+                continue
+            part = rollup[max(0, k - window + 1):k + 1]
+            count = sum(c for _, c, _ in part)
+            total = sum(s for _, _, s in part)
+            result.append((month, total / count))
+        return result
+
+
+timeline: Optional[GradeTimeline] = None
+
+
+def get_timeline() -> GradeTimeline:
+    global timeline
+    if timeline is None or file_version(data_file()) != timeline.source:
+        timeline = GradeTimeline.build()
+    return timeline
+
+def parse_bound(text: str, end: bool) -> Optional[int]:
+    """YYYY-MM-DD or YYYY-MM (the whole month) to a date ordinal."""
+    if validate_date(text):
+        return date_ordinal(text)
+    if re.match(r"^\d{4}-(0[1-9]|1[0-2])$", text):
+        return month_bounds(text)[1 if end else 0]
+    return None
+
 # ------------------ Actions ------------------
 
 def add_grade():
@@ -69,37 +414,123 @@ def add_grade():
         "score": float(score)
     }
 
-    save_grade(record)
+    before = file_version(data_file())
+    get_store().append(record)
+    if timeline is not None and timeline.source == before:
+        timeline.add(record)
+        timeline.source = file_version(data_file())
     print("✅ Оцінку додано")
 
 def show_all():
-    grades = load_grades()
-    if not grades:
-        print("Записів немає")
-        return
+    shown = False
+    for chunk in iter_grade_chunks():
+        letters = ects_letters(chunk.scores)
+        for subject, date, score, letter in zip(chunk.subjects, chunk.dates, chunk.scores, letters):
+            print(f"{subject} — {date} — {score} — {letter}")
+        shown = True
 
-    for g in grades:
-        print(f"{g['subject']} — {g['date']} — {g['score']} — {ects_letter(g['score'])}")
+    if not shown:
+        print("Записів немає")
 
 def average_by_subject():
     subject = input("Введіть дисципліну: ").strip()
-    grades = [g["score"] for g in load_grades() if g["subject"] == subject]
+    stats = get_store().stats(subject)
 
-    if not grades:
+    if not stats:
         print("Записів не знайдено")
         return
 
-    avg = sum(grades) / len(grades)
+    avg = stats["mean"]
     print(f"Середній бал: {avg:.2f} ({ects_letter(avg)})")
+    print(f"Оцінок: {stats['count']}, стандартне відхилення: {stats['std']:.2f}")
 
 def average_all():
-    grades = [g["score"] for g in load_grades()]
-    if not grades:
+    stats = get_store().stats()
+    if not stats:
         print("Записів немає")
         return
 
-    avg = sum(grades) / len(grades)
+    avg = stats["mean"]
     print(f"Загальний середній бал: {avg:.2f} ({ects_letter(avg)})")
+    print(f"Оцінок: {stats['count']}, стандартне відхилення: {stats['std']:.2f}")
+
+def show_distribution():
+    subject = input("Дисципліна (порожньо — всі): ").strip() or None
+    letters = get_store().distribution(subject)
+    total = sum(letters.values())
+
+    if not total:
+        print("Записів не знайдено")
+        return
+
+    for letter in ("A", "B", "C", "D", "E", "FX", "F"):
+        n = letters.get(letter, 0)
+        print(f"{letter:2} — {n} ({n / total * 100:.1f}%)")
+
+def show_statistics():
+    names, codes, scores = load_score_columns()
+    if not scores:
+        print("Записів немає")
+        return
+
+    ordered = array("d", sorted(scores))
+    print(f"Оцінок: {len(ordered)}")
+    print("Процентилі: " + ", ".join(
+        f"P{p}={percentile(ordered, p):.1f}" for p in (10, 25, 50, 75, 90)
+    ))
+
+    print("Розподіл ECTS:")
+    for letter, n in ects_histogram(ordered).items():
+        print(f"  {letter:2} — {n}")
+
+    print("Середній бал по дисциплінах:")
+    for name, mean in zip(names, group_means(codes, scores, len(names))):
+        print(f"  {name}: {mean:.2f} ({ects_letter(mean)})")
+
+def average_for_period():
+    subject = input("Дисципліна: ").strip()
+    start = parse_bound(input("Від (YYYY-MM або YYYY-MM-DD): ").strip(), end=False)
+    end = parse_bound(input("До (YYYY-MM або YYYY-MM-DD): ").strip(), end=True)
+
+    if start is None or end is None:
+        print("❌ Невірні дані")
+        return
+
+    count, total = get_timeline().range_stats(subject, start, end)
+    if not count:
+        print("Записів не знайдено")
+        return
+
+    avg = total / count
+    print(f"Середній бал за період: {avg:.2f} ({ects_letter(avg)}), оцінок: {count}")
+
+def show_trend():
+    subject = input("Дисципліна: ").strip()
+    start = input("Від місяця (YYYY-MM, порожньо — з початку): ").strip() or None
+    end = input("До місяця (YYYY-MM, порожньо — до кінця): ").strip() or None
+
+    trend = get_timeline().moving_average(subject, 3, start, end)
+    if not trend:
+        print("Записів не знайдено")
+        return
+
+    print("Місяць  — ковзне середнє за 3 місяці")
+    for month, avg in trend:
+        print(f"{month} — {avg:.2f} ({ects_letter(avg)})")
+
+def switch_to_binary():
+    if use_binary():
+        print("Вже використовується бінарний формат")
+        return
+    count = convert_to_binary()
+    print(f"✅ {count} оцінок перенесено в {BIN_FILE}; {FILE} більше не використовується")
+
+def switch_to_csv():
+    if not use_binary():
+        print("Вже використовується CSV")
+        return
+    count = convert_to_csv()
+    print(f"✅ {count} оцінок перенесено в {FILE}")
 
 # ------------------ Menu ------------------
 
@@ -109,6 +540,12 @@ def menu():
         "2": show_all,
         "3": average_by_subject,
         "4": average_all,
+        "5": show_distribution,
+        "6": show_statistics,
+        "7": average_for_period,
+        "8": show_trend,
+        "9": switch_to_binary,
+        "10": switch_to_csv,
         "0": exit
     }
 
@@ -118,6 +555,12 @@ def menu():
 2 — Переглянути всі оцінки
 3 — Середній бал по дисципліні
 4 — Загальний середній бал
+5 — Розподіл за ECTS
+6 — Статистика (процентилі, розподіл, середні)
+7 — Середній бал за період
+8 — Тренд по місяцях
+9 — Перейти на бінарний формат
+10 — Повернутися до CSV
 0 — Вийти
 """)
         choice = input("Ваш вибір: ").strip()
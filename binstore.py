@@ -0,0 +1,174 @@
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from storage import atomic_open, file_lock, file_version, write_atomic
+
+# ------------------ Бінарний формат записів ------------------
+#
+# Файл складається із заголовка (MAGIC + розмір запису) і записів фіксованої
+# довжини, упакованих struct. Рядкові поля кодуються словником: у записі
+# лежить номер рядка, а самі рядки — у JSON-файлі <файл>.dict.
+# Читання йде через mmap без копіювання, дописування — одним write().
+
+MAGIC = b"SKB1"
+HEADER = struct.Struct("<4sI")
+
+
+class BinaryTable:
+    def __init__(self, path: str, fmt: str, encoded: Sequence[int]):
+        """fmt — формат struct одного запису, encoded — номери полів,
+        які в записі є кодами рядків зі словника."""
+        self.path = path
+        self.dict_path = path + ".dict"
+        self.record = struct.Struct(fmt)
+        self.encoded = tuple(encoded)
+        self.strings: Dict[int, List[str]] = {}
+        self.codes: Dict[int, Dict[str, int]] = {}
+        self.dict_version = None
+
+    # ------------------ Словник ------------------
+
+    def load_dictionary(self) -> None:
+        version = file_version(self.dict_path)
+        if version == self.dict_version and self.strings:
+            return
+
+        try:
+            with open(self.dict_path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            raw = {}
+
+        self.strings = {i: raw.get(str(i), []) for i in self.encoded}
+        self.codes = {i: {s: n for n, s in enumerate(self.strings[i])} for i in self.encoded}
+        self.dict_version = version
+
+    def save_dictionary(self) -> None:
+        raw = {str(i): self.strings[i] for i in self.encoded}
+        write_atomic(self.dict_path, json.dumps(raw, ensure_ascii=False))
+        self.dict_version = file_version(self.dict_path)
+
+    def encode(self, row: Sequence) -> Tuple[tuple, bool]:
+        """Замінює рядки кодами; другий елемент — чи зʼявились нові рядки."""
+        values = list(row)
+        added = False
+        for i in self.encoded:
+            code = self.codes[i].get(values[i])
+            if code is None:
+                code = self.codes[i][values[i]] = len(self.strings[i])
+                self.strings[i].append(values[i])
+                added = True
+            values[i] = code
+        return tuple(values), added
+
+    def decode(self, values: tuple) -> tuple:
+        if not self.encoded:
+            return values
+        values = list(values)
+        for i in self.encoded:
+            values[i] = self.strings[i][values[i]]
+        return tuple(values)
+
+    # ------------------ Читання ------------------
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def iter_rows(self) -> Iterator[tuple]:
+        if not self.exists():
+            return
+
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= HEADER.size:
+                return
+            # Спершу фіксуємо розмір, потім читаємо словник: рядки, дописані
+            # після fstat, не потраплять у вибірку, а їхні коди вже є в словнику.
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                self.load_dictionary()
+                self._check_header(mm[:HEADER.size])
+                # Недописаний хвіст після збою ігнорується
+                end = HEADER.size + (size - HEADER.size) // self.record.size * self.record.size
+                with memoryview(mm) as view:
+                    body = view[HEADER.size:end]
+                    try:
+                        for values in self.record.iter_unpack(body):
+                            yield self.decode(values)
+                    finally:
+                        body.release()
+
+    def last_row(self) -> Optional[tuple]:
+        """Останній запис за O(1) — без читання всього файлу."""
+        if not self.exists():
+            return None
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            count = (size - HEADER.size) // self.record.size
+            if count <= 0:
+                return None
+            f.seek(HEADER.size + (count - 1) * self.record.size)
+            values = self.record.unpack(f.read(self.record.size))
+        self.load_dictionary()
+        return self.decode(values)
+
+    def stored_record_size(self) -> Optional[int]:
+        """Розмір запису з заголовка файлу (None, якщо файлу чи заголовка немає)."""
+        if not self.exists():
+            return None
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        return HEADER.unpack(header)[1]
+
+    def _check_header(self, header: bytes) -> None:
+        magic, record_size = HEADER.unpack(header)
+        if magic != MAGIC or record_size != self.record.size:
+            raise ValueError(f"{self.path}: невідомий формат файлу")
+
+    # ------------------ Запис ------------------
+
+    def append(self, row: Sequence) -> None:
+        self.append_many([row])
+
+    def append_many(self, rows: Iterable[Sequence]) -> None:
+        """Дописує rows одним write() і чекає, поки вони потраплять на диск."""
+        with file_lock(self.path):
+            self.load_dictionary()
+            packed = []
+            added = False
+            for row in rows:
+                values, new = self.encode(row)
+                packed.append(self.record.pack(*values))
+                added = added or new
+            # Словник зберігається раніше за записи, які на нього посилаються
+            if added:
+                self.save_dictionary()
+
+            with open(self.path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(HEADER.pack(MAGIC, self.record.size))
+                f.write(b"".join(packed))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def write_all(self, rows: Iterable[Sequence]) -> int:
+        """Атомарно перезаписує таблицю рядками rows; повертає їх кількість."""
+        with file_lock(self.path):
+            # Словник лише доповнюється: старі коди лишаються чинними, тож
+            # попередній файл читається правильно, навіть якщо заміну перервано.
+            self.load_dictionary()
+
+            count = 0
+            with atomic_open(self.path, binary=True) as f:
+                f.write(HEADER.pack(MAGIC, self.record.size))
+                for row in rows:
+                    values, _ = self.encode(row)
+                    f.write(self.record.pack(*values))
+                    count += 1
+                # Словник має бути на диску до того, як новий файл замінить старий
+                self.save_dictionary()
+        return count
@@ -0,0 +1,105 @@
+from bisect import bisect_left, bisect_right, insort
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ------------------ Аналітика бюджету ------------------
+#
+# Записи тримаються відсортованими за місяцем разом із префіксними сумами
+# доходів і витрат: prefix[i] — сума перших i місяців. Будь-яка сума за
+# проміжок — це різниця двох префіксів, знайдених бінарним пошуком.
+# Суми — цілі копійки, тож префікси точні на будь-якій довжині історії.
+
+
+class BudgetAnalytics:
+    def __init__(self, records: Iterable[dict] = ()):
+        self.months: List[str] = []
+        self.income_prefix: List[int] = [0]
+        self.expenses_prefix: List[int] = [0]
+        # (витрати, місяць) за зростанням — для топ-k без сортування
+        self.by_expense: List[Tuple[int, str]] = []
+
+        for record in sorted(records, key=lambda r: r["month"]):
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    # ------------------ Оновлення ------------------
+
+    def add(self, record: dict) -> None:
+        """Додає місяць. Новий останній місяць коштує O(1), вставка в
+        середину перераховує префікси лише від місця вставки."""
+        month = record["month"]
+        i = bisect_left(self.months, month)
+        if i < len(self.months) and self.months[i] == month:
+            raise ValueError(f"Місяць {month} вже є")
+
+        self.months.insert(i, month)
+        insort(self.by_expense, (record["expenses"], month))
+
+        if i == len(self.months) - 1:
+            self.income_prefix.append(self.income_prefix[-1] + record["income"])
+            self.expenses_prefix.append(self.expenses_prefix[-1] + record["expenses"])
+            return
+
+        self._insert_prefix(i, record["income"], record["expenses"])
+
+    def update(self, old: dict, new: dict) -> None:
+        """Замінює суми вже наявного місяця (old і new мають той самий місяць)."""
+        month = old["month"]
+        i = bisect_left(self.months, month)
+        if i == len(self.months) or self.months[i] != month:
+            raise KeyError(month)
+
+        k = bisect_left(self.by_expense, (old["expenses"], month))
+        del self.by_expense[k]
+        insort(self.by_expense, (new["expenses"], month))
+
+        self._shift_prefix(i + 1, new["income"] - old["income"], new["expenses"] - old["expenses"])
+
+    def _insert_prefix(self, i: int, income: int, expenses: int) -> None:
+        self.income_prefix.insert(i + 1, self.income_prefix[i])
+        self.expenses_prefix.insert(i + 1, self.expenses_prefix[i])
+        self._shift_prefix(i + 1, income, expenses)
+
+    def _shift_prefix(self, start: int, income: int, expenses: int) -> None:
+        for j in range(start, len(self.income_prefix)):
+            self.income_prefix[j] += income
+            self.expenses_prefix[j] += expenses
+
+    # ------------------ Запити ------------------
+
+    def _bounds(self, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        i = 0 if start is None else bisect_left(self.months, start)
+        j = len(self.months) if end is None else bisect_right(self.months, end)
+        return i, max(i, j)
+
+    def total(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, int]:
+        """Доходи, витрати й залишок за місяці start..end включно."""
+        i, j = self._bounds(start, end)
+        income = self.income_prefix[j] - self.income_prefix[i]
+        expenses = self.expenses_prefix[j] - self.expenses_prefix[i]
+        return {"months": j - i, "income": income, "expenses": expenses, "balance": income - expenses}
+
+    def rolling_average(self, window: int, end: Optional[str] = None) -> Optional[Dict[str, Fraction]]:
+        """Середнє за останні window записаних місяців до end включно (точний дріб копійок)."""
+        _, j = self._bounds(None, end)
+        i = max(0, j - window)
+        if i == j:
+            return None
+        totals = self.total(self.months[i], self.months[j - 1])
+        n = j - i
+        return {
+            "months": n,
+            "income": Fraction(totals["income"], n),
+            "expenses": Fraction(totals["expenses"], n),
+            "balance": Fraction(totals["balance"], n),
+        }
+
+    def cumulative_balance(self, month: Optional[str] = None) -> int:
+        """Накопичений залишок від першого запису до month включно."""
+        return self.total(None, month)["balance"]
+
+    def top_expenses(self, k: int) -> List[Tuple[str, int]]:
+        """k місяців з найбільшими витратами, за спаданням."""
+        return [(month, expenses) for expenses, month in reversed(self.by_expense[-k:])] if k > 0 else []
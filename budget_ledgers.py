@@ -0,0 +1,168 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from statistics import median
+from typing import Dict, Iterator, List, Optional
+
+from money import to_minor
+from storage import file_lock, write_atomic
+
+# ------------------ Бюджети багатьох користувачів ------------------
+#
+# Кожен користувач має власний файл ledgers/users/<id>.json у форматі
+# budget.json, тож робота з одним бюджетом читає й переписує лише його файл.
+# ledgers/manifest.json перелічує відомі бюджети для звітів по всіх користувачах.
+# Бюджети лежать в окремому каталозі, щоб жоден id не збігся з маніфестом;
+# файли зі старого розташування ledgers/<id>.json переносяться при відкритті.
+
+LEDGER_DIR = "ledgers"
+USERS_DIR = os.path.join(LEDGER_DIR, "users")
+MANIFEST = "manifest.json"
+DEFAULT_USER = "default"
+
+
+def validate_user_id(user_id: str) -> bool:
+    return bool(re.match(r"^[\w-]{1,64}$", user_id))
+
+
+def ledger_path(user_id: str) -> str:
+    return os.path.join(USERS_DIR, f"{user_id}.json")
+
+
+def manifest_path() -> str:
+    return os.path.join(LEDGER_DIR, MANIFEST)
+
+
+def old_ledger_path(user_id: str) -> Optional[str]:
+    """Старе розташування бюджету; None, якщо воно збігається з маніфестом."""
+    path = os.path.join(LEDGER_DIR, f"{user_id}.json")
+    return None if path == manifest_path() else path
+
+
+def stored_ledger_path(user_id: str) -> str:
+    """Шлях до наявного файлу бюджету, навіть якщо його ще не перенесли."""
+    path = ledger_path(user_id)
+    old = old_ledger_path(user_id)
+    if not os.path.exists(path) and old and os.path.exists(old):
+        return old
+    return path
+
+
+def migrate_ledger(user_id: str) -> None:
+    old = old_ledger_path(user_id)
+    if old is None or os.path.exists(ledger_path(user_id)):
+        return
+    try:
+        os.replace(old, ledger_path(user_id))
+    except FileNotFoundError:
+        # Старого файлу немає або його вже переніс інший процес
+        pass
+
+
+def load_manifest() -> Dict[str, dict]:
+    try:
+        with open(manifest_path(), "r", encoding="utf-8") as f:
+            return json.load(f)["ledgers"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return {}
+
+
+def register_ledger(user_id: str) -> None:
+    """Додає бюджет у маніфест, якщо його там ще немає."""
+    if user_id in load_manifest():
+        return
+
+    os.makedirs(LEDGER_DIR, exist_ok=True)
+    with file_lock(manifest_path()):
+        ledgers = load_manifest()
+        if user_id in ledgers:
+            return
+        ledgers[user_id] = {"file": os.path.relpath(ledger_path(user_id), LEDGER_DIR)}
+        write_atomic(manifest_path(), json.dumps({"ledgers": ledgers}, ensure_ascii=False, indent=4))
+
+
+def open_ledger(user_id: str, legacy_file: Optional[str] = None) -> str:
+    """Готує файл бюджету користувача й повертає шлях до нього.
+
+    Якщо бюджет ще не створено, а legacy_file (старий однокористувацький
+    budget.json) існує, його вміст стає початковим бюджетом.
+    """
+    os.makedirs(USERS_DIR, exist_ok=True)
+    migrate_ledger(user_id)
+    path = ledger_path(user_id)
+
+    if not os.path.exists(path) and legacy_file and os.path.exists(legacy_file):
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            write_atomic(path, f.read())
+
+    register_ledger(user_id)
+    return path
+
+
+# ------------------ Звіти по всіх бюджетах ------------------
+
+def ledger_summary(path: str) -> Optional[dict]:
+    """Підсумок одного бюджету; виконується й в окремому процесі."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    records = data.get("records", [])
+    if not records:
+        return None
+
+    # Бюджет, який ще не відкривали після переходу на копійки
+    if data.get("units") == "kopecks":
+        expenses = [r["expenses"] for r in records]
+    else:
+        expenses = [to_minor(r["expenses"]) for r in records]
+    return {
+        "months": len(expenses),
+        "total_expenses": sum(expenses),
+        "median_expenses": median(expenses),
+    }
+
+
+def iter_ledger_summaries(processes: int = 1) -> Iterator[dict]:
+    """Потоково віддає підсумки бюджетів з маніфесту.
+
+    У памʼяті одночасно лежить лише один бюджет (або по одному на процес).
+    """
+    paths = [stored_ledger_path(user_id) for user_id in load_manifest()]
+
+    if processes > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            summaries = pool.map(ledger_summary, paths, chunksize=16)
+            for summary in summaries:
+                if summary is not None:
+                    yield summary
+        return
+
+    for path in paths:
+        summary = ledger_summary(path)
+        if summary is not None:
+            yield summary
+
+
+def cross_ledger_report(processes: int = 1) -> Optional[dict]:
+    """Медіана середньомісячних витрат (у копійках) серед усіх користувачів.
+
+    Зберігається одне число на користувача, а не всі записи всіх бюджетів.
+    """
+    averages: List[float] = []
+    months = 0
+    for summary in iter_ledger_summaries(processes):
+        averages.append(summary["total_expenses"] / summary["months"])
+        months += summary["months"]
+
+    if not averages:
+        return None
+
+    return {
+        "users": len(averages),
+        "months": months,
+        "median_monthly_expenses": median(averages),
+    }
@@ -0,0 +1,37 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from fractions import Fraction
+from typing import Optional, Union
+
+# ------------------ Гроші у копійках ------------------
+#
+# Суми зберігаються й додаються як цілі копійки, тому підсумки точні
+# за будь-якої кількості записів. Decimal потрібен лише на межах:
+# при розборі введення, міграції старих float-значень і виведенні.
+
+CENT = Decimal("0.01")
+
+
+def parse_money(text: str) -> Optional[int]:
+    """'12.5' або '12,50' -> 1250. None, якщо це не сума з точністю до копійки."""
+    try:
+        value = Decimal(text.strip().replace(",", "."))
+        # quantize теж кидає InvalidOperation — для чисел, довших за точність контексту
+        if not value.is_finite() or value != value.quantize(CENT):
+            return None
+    except InvalidOperation:
+        return None
+    return int(value * 100)
+
+
+def to_minor(value: Union[int, float, str]) -> int:
+    """Переводить суму в гривнях зі старого формату (зазвичай float) у копійки."""
+    return int((Decimal(str(value)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def format_money(minor: Union[int, float, Fraction, Decimal]) -> str:
+    """1250 -> '12.50'. Приймає й дробові копійки (наприклад, середні значення)."""
+    if isinstance(minor, Fraction):
+        value = Decimal(minor.numerator) / Decimal(minor.denominator)
+    else:
+        value = Decimal(minor)
+    return str((value / 100).quantize(CENT, rounding=ROUND_HALF_UP))
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from statistics import quantiles
+from typing import Dict, List, Optional, Tuple
+
+from TaskFour import CATALOG_FILE, Line, format_lines, load_catalog, save_new_orders
+from storage import file_version
+
+# ------------------ Сервіс прийому замовлень ------------------
+#
+# Каси надсилають замовлення на localhost по TCP, по одному JSON на рядок:
+#     {"date": "2025-11-25", "items": [1, 2, 2]}
+# і отримують у відповідь {"ok": true, "id": 17, "total": 90} або
+# {"ok": false, "error": "..."}.
+#
+# Усі замовлення проходять через одну чергу. Поки попередня група пишеться
+# на диск, нові замовлення накопичуються, і наступна група дописується
+# одним write() з одним fsync під одним резервуванням ID (group commit).
+# Файл замовлень пише лише один потік, тож рядки ніколи не перемішуються.
+
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_MAX = 1000  # замовлень в одній групі
+
+
+class Catalog:
+    """Меню з menu.json; перечитується, коли файл змінили."""
+
+    def __init__(self):
+        self.version = None
+        self.dishes: Dict[int, Dict] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        version = file_version(CATALOG_FILE)
+        if version != self.version or not self.dishes:
+            try:
+                self.dishes = load_catalog()["dishes"]
+            except (OSError, ValueError, KeyError):
+                # Пошкоджене меню не зупиняє прийом — лишається попереднє
+                return
+            self.version = version
+
+
+def validate_order(request: Dict, dishes: Dict[int, Dict]) -> Tuple[Optional[Dict], Optional[str]]:
+    """Перетворює запит каси на замовлення без ID; друге значення — текст помилки."""
+    items = request.get("items")
+    if not isinstance(items, list) or not items:
+        return None, "items має бути непорожнім списком номерів страв"
+    for n in items:
+        # bool — підклас int, і True == 1 знайшлося б у меню
+        if type(n) is not int or n not in dishes:
+            return None, f"Страви з номером {n!r} немає в меню"
+
+    date = request.get("date") or f"{datetime.now():%Y-%m-%d}"
+    if not isinstance(date, str) or ";" in date or "\n" in date:
+        return None, "Невірна дата"
+
+    lines = [Line(n, qty, dishes[n]["price"]) for n, qty in Counter(items).items()]
+    now = datetime.now()
+    return {
+        "date": date,
+        "time": now.hour * 60 + now.minute,
+        "items_str": format_lines(lines),
+        "total": sum(l.qty * l.price for l in lines),
+    }, None
+
+
+class OrderService:
+    def __init__(self):
+        self.catalog = Catalog()
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def commit_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < BATCH_MAX and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            orders = [order for order, _ in batch]
+            try:
+                # Запис і fsync — в окремому потоці, щоб цикл подій приймав нові замовлення
+                await loop.run_in_executor(None, save_new_orders, orders)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for order, future in batch:
+                    if not future.done():
+                        future.set_result(order)
+            self.catalog.refresh()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.submit(line, loop)
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def submit(self, line: bytes, loop: asyncio.AbstractEventLoop) -> Dict:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "Очікується JSON"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Очікується JSON-обʼєкт"}
+
+        order, error = validate_order(request, self.catalog.dishes)
+        if error:
+            return {"ok": False, "error": error}
+
+        future = loop.create_future()
+        await self.queue.put((order, future))
+        try:
+            order = await future
+        except Exception as e:
+            return {"ok": False, "error": f"Не вдалося зберегти замовлення: {e}"}
+        return {"ok": True, "id": order["id"], "total": order["total"]}
+
+
+async def serve(host: str, port: int) -> None:
+    service = OrderService()
+    committer = asyncio.create_task(service.commit_loop())
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Приймаю замовлення на {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        committer.cancel()
+
+
+# ------------------ Навантажувальний тест ------------------
+#
+# Запускається проти працюючого сервісу й справді створює замовлення,
+# тож його варто проганяти в окремій копії каталогу з даними.
+
+async def bench_client(host: str, port: int, count: int, latencies: List[float]) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    request = json.dumps({"date": "bench", "items": [1, 2, 2]}).encode("utf-8") + b"\n"
+    for _ in range(count):
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if not reply.get("ok"):
+            errors += 1
+    writer.close()
+    await writer.wait_closed()
+    return errors
+
+
+async def bench(host: str, port: int, clients: int, orders: int) -> None:
+    latencies: List[float] = []
+    per_client = max(1, orders // clients)
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(bench_client(host, port, per_client, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    cuts = quantiles(latencies, n=100)
+    print(f"Замовлень: {len(latencies)}, помилок: {sum(errors)}, клієнтів: {clients}")
+    print(f"Пропускна здатність: {len(latencies) / elapsed:.0f} замовлень/с")
+    print(f"Затримка: p50 {cuts[49] * 1000:.2f} мс, p95 {cuts[94] * 1000:.2f} мс, p99 {cuts[98] * 1000:.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервіс прийому замовлень для кількох кас")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="запустити сервіс")
+    bench_parser = commands.add_parser("bench", help="виміряти пропускну здатність і затримку")
+    bench_parser.add_argument("--clients", type=int, default=50)
+    bench_parser.add_argument("--orders", type=int, default=20000)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.host, args.port))
+        else:
+            asyncio.run(bench(args.host, args.port, args.clients, args.orders))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
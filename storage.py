@@ -0,0 +1,120 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ------------------ Спільне збереження файлів ------------------
+#
+# Запис іде у тимчасовий файл поруч із цільовим, який після fsync
+# перейменовується поверх цільового: читачі бачать або старий, або новий
+# файл повністю й ніколи не блокуються. Записувачі беруть рекомендаційне
+# блокування <файл>.lock і перевіряють, що файл не змінився з моменту читання.
+
+
+class ConflictError(Exception):
+    """Файл змінив інший процес після того, як його було прочитано."""
+
+
+def file_version(path: str):
+    """Версія файлу для оптимістичної перевірки: (inode, mtime_ns, size) або None.
+
+    Атомарна заміна завжди створює новий inode, тож зміну видно навіть тоді,
+    коли розмір і час модифікації збіглися.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+@contextmanager
+def file_lock(path: str):
+    """Ексклюзивне рекомендаційне блокування для path (через path + ".lock")."""
+    f = open(path + ".lock", "a+", encoding="utf-8")
+    try:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.close()
+
+
+def fsync_dir(path: str) -> None:
+    # Щоб перейменування пережило збій живлення (лише POSIX)
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(path: str, binary: bool = False):
+    """Відкриває тимчасовий файл, який після успішного виходу з блоку
+    замінює path. Дозволяє записувати великі файли частинами."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        if binary:
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding="utf-8", newline="")
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    fsync_dir(path)
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Замінює вміст path на text так, що файл ніколи не буває недописаним."""
+    with atomic_open(path) as f:
+        f.write(text)
+
+
+def save_checked(path: str, text: str, version) -> None:
+    """Атомарно записує text, якщо версія path досі дорівнює version.
+
+    Інакше кидає ConflictError: викликач має перечитати файл і повторити зміну.
+    """
+    with file_lock(path):
+        if file_version(path) != version:
+            raise ConflictError(path)
+        write_atomic(path, text)
+
+
+def append_durable(path: str, text: str) -> None:
+    """Дописує text у кінець path і чекає, поки дані потраплять на диск."""
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def quarantine(path: str) -> str:
+    """Відкладає пошкоджений файл як path.corrupt замість того, щоб затерти його."""
+    backup = path + ".corrupt"
+    os.replace(path, backup)
+    return backup